@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Literal, Optional
 
 
 class Settings(BaseSettings):
@@ -9,6 +9,34 @@ class Settings(BaseSettings):
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     upload_dir: str = "uploads"
+    max_upload_size_mb: int = 500
+    # direct: stream from the API; signed_url: redirect to a file server with an HMAC-signed URL;
+    # x_accel_redirect / x_sendfile: let the front proxy stream the file
+    download_mode: Literal["direct", "signed_url", "x_accel_redirect", "x_sendfile"] = "direct"
+    download_base_url: str = "http://localhost:8001/files"
+    download_url_ttl_seconds: int = 300
+    download_internal_prefix: str = "/protected-uploads"
+    blob_gc_interval_seconds: int = 600
+    blob_gc_grace_seconds: int = 3600
+    archive_scan_workers: int = 2
+    archive_max_entries: int = 10000
+    archive_max_uncompressed_mb: int = 4096
+    archive_max_ratio: float = 100.0
+    principal_cache_size: int = 10000
+    principal_cache_ttl_seconds: int = 300
+    user_cache_size: int = 10000
+    user_cache_ttl_seconds: int = 300
+    password_hash_workers: int = 4
+    password_hash_queue_limit: int = 32
+    slow_query_threshold_ms: int = 100
+    slow_query_explain: bool = True
+    slow_query_explain_interval_seconds: int = 60
+    slow_query_log_mb: int = 16
+    # Request metadata for benchmarks.replay; capture is off unless a directory is set
+    traffic_capture_dir: Optional[str] = None
+    traffic_capture_sample_rate: float = 1.0
+    traffic_capture_max_mb: int = 100
+    traffic_capture_files: int = 10
     
     class Config:
         env_file = ".env"
@@ -1,5 +1,9 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.read_concern import ReadConcern
+from pymongo.write_concern import WriteConcern
 from app.config import settings
+from app.utils.metrics import mongo_command_listener
+from app.utils.slow_queries import slow_query_listener
 import certifi
 
 client = None
@@ -15,6 +19,8 @@ async def connect_to_mongo():
         serverSelectionTimeoutMS=5000,  # 5 second timeout
         connectTimeoutMS=10000,  # 10 second connection timeout
         socketTimeoutMS=20000,  # 20 second socket timeout
+        # Per-route command counts for /metrics, and the slow-query log
+        event_listeners=[mongo_command_listener, slow_query_listener],
     )
     database = client[settings.database_name]
     print(f"Connected to MongoDB database: {settings.database_name}")
@@ -30,3 +36,19 @@ async def close_mongo_connection():
 def get_database():
     return database
 
+
+async def run_transaction(callback):
+    """Run `await callback(session)` inside a multi-document transaction.
+
+    The driver retries the callback on transient errors (such as write conflicts
+    with a concurrent transaction) and aborts it when the callback raises, so an
+    HTTPException raised halfway rolls back every write made before it.
+    Transactions need a replica set or sharded cluster (Atlas, or a single-node
+    replica set locally).
+    """
+    async with await client.start_session() as session:
+        return await session.with_transaction(
+            callback,
+            read_concern=ReadConcern("majority"),
+            write_concern=WriteConcern("majority"),
+        )
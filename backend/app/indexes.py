@@ -0,0 +1,189 @@
+"""
+Declarative index registry.
+
+INDEXES lists every index the routers rely on, per collection; ensure_indexes applies
+them at startup. QUERY_SHAPES rebuilds the filters, sorts and pipelines the routers
+issue, with the routers' own helpers, so that check_indexes.py can explain() each one
+and flag collection scans. EXPECTED_SCANS names the shapes that scan by design.
+"""
+from datetime import datetime
+from typing import Optional
+from bson import ObjectId
+from pymongo import ASCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+from app.utils.blobs import garbage_filter
+from app.utils.pagination import (
+    DEFAULT_PAGE_SIZE, PAGE_SORT, PageParams, encode_cursor, encode_score_cursor, keyset_query, text_page_stages,
+)
+from app.utils.search import project_substring_query, user_search_query, visible_projects
+
+PLACEHOLDER_ID = "000000000000000000000000"
+
+
+def page_index(*prefix: str, **options) -> IndexModel:
+    """Equality prefix followed by the pagination sort key (created_at, _id)"""
+    keys = [*((field, ASCENDING) for field in prefix), ("created_at", ASCENDING), ("_id", ASCENDING)]
+    return IndexModel(keys, **options)
+
+
+INDEXES = {
+    "users": [
+        # get_current_user, login and register all look users up by email
+        IndexModel([("email", ASCENDING)], unique=True),
+        page_index(),
+        page_index("role"),
+    ],
+    "projects": [
+        page_index(),
+        page_index("buyer_id"),
+        # The solver feed $or is answered by merging these two index scans
+        page_index("status"),
+        page_index("assigned_solver_id"),
+        # search_projects ranks matches by this index's weighted score
+        IndexModel(
+            [("title", TEXT), ("description", TEXT), ("requirements", TEXT)],
+            weights={"title": 10, "description": 4, "requirements": 2},
+            name="project_search",
+        ),
+    ],
+    "requests": [
+        # One request per solver per project
+        IndexModel([("project_id", ASCENDING), ("solver_id", ASCENDING)], unique=True),
+        page_index("project_id"),
+        # Fan-out of changed user details onto denormalized copies
+        IndexModel([("solver_id", ASCENDING)]),
+        IndexModel([("buyer_id", ASCENDING)]),
+    ],
+    "tasks": [
+        page_index("project_id"),
+    ],
+    "plans": [
+        page_index("request_id"),
+    ],
+    "blobs": [
+        # Garbage collector: unreferenced blobs past the grace period
+        IndexModel([("refcount", ASCENDING), ("released_at", ASCENDING)]),
+    ],
+    "milestones": [
+        page_index("plan_id"),
+    ],
+}
+
+
+PLACEHOLDER_TIME = datetime(2024, 1, 1)
+PLACEHOLDER_CURSOR = encode_cursor({"created_at": PLACEHOLDER_TIME, "_id": ObjectId(PLACEHOLDER_ID)})
+PLACEHOLDER_SCORE_CURSOR = encode_score_cursor({"_score": 1.0, "_id": ObjectId(PLACEHOLDER_ID)})
+PLACEHOLDER_SEARCH = "example"
+
+# Base filters of the project listing and search, per role
+PROJECT_FEEDS = {
+    name: visible_projects(role, PLACEHOLDER_ID)
+    for name, role in (("admin", "admin"), ("buyer", "buyer"), ("solver", "problem_solver"))
+}
+
+
+def _find(query: dict, sort: Optional[list] = None) -> dict:
+    return {"filter": query, "sort": dict(sort)} if sort else {"filter": query}
+
+
+def _pages(name: str, collection: str, query: dict) -> list[tuple]:
+    """The first and a later page of a find_page listing, with the keyset cursor predicate"""
+    return [
+        (name, collection, _find(keyset_query(query, None), PAGE_SORT)),
+        (f"{name}, next page", collection, _find(keyset_query(query, PLACEHOLDER_CURSOR), PAGE_SORT)),
+    ]
+
+
+def _text_pages(name: str, collection: str, query: dict) -> list[tuple]:
+    """The first and a later page of a text_page_stages search"""
+    def pipeline(cursor: Optional[str]) -> dict:
+        page = PageParams(limit=DEFAULT_PAGE_SIZE, cursor=cursor)
+        return {"pipeline": text_page_stages(query, PLACEHOLDER_SEARCH, page)}
+
+    return [
+        (name, collection, pipeline(None)),
+        (f"{name}, next page", collection, pipeline(PLACEHOLDER_SCORE_CURSOR)),
+    ]
+
+
+# (name, collection, find filter and sort, or aggregation pipeline) for every query
+# shape the routers issue, built with the same helpers the routers use
+QUERY_SHAPES = [
+    ("auth: user by email", "users", _find({"email": "user@example.com"})),
+    *_pages("users: list all", "users", {}),
+    *_pages("users: problem solvers", "users", {"role": "problem_solver"}),
+    *_pages("users: search", "users", user_search_query(PLACEHOLDER_SEARCH, None)),
+    *_pages("users: search by role", "users", user_search_query(PLACEHOLDER_SEARCH, "problem_solver")),
+    *(shape for role, query in PROJECT_FEEDS.items()
+      for shape in _pages(f"projects: {role} listing", "projects", query)),
+    *(shape for role, query in PROJECT_FEEDS.items()
+      for shape in _text_pages(f"projects: {role} text search", "projects", query)),
+    *(shape for role, query in PROJECT_FEEDS.items()
+      for shape in _pages(f"projects: {role} substring search", "projects",
+                          project_substring_query(query, PLACEHOLDER_SEARCH))),
+    (
+        "requests: existing request check",
+        "requests",
+        _find({"project_id": PLACEHOLDER_ID, "solver_id": PLACEHOLDER_ID}),
+    ),
+    *_pages("requests: by project", "requests", {"project_id": PLACEHOLDER_ID}),
+    ("requests: solver detail fan-out", "requests", _find({"solver_id": PLACEHOLDER_ID})),
+    ("requests: buyer detail fan-out", "requests", _find({"buyer_id": PLACEHOLDER_ID})),
+    *_pages("tasks: by project", "tasks", {"project_id": PLACEHOLDER_ID}),
+    *_pages("plans: by request", "plans", {"request_id": PLACEHOLDER_ID}),
+    ("milestones: by plan", "milestones", _find({"plan_id": PLACEHOLDER_ID}, PAGE_SORT)),
+    ("blobs: garbage collection", "blobs", _find(garbage_filter(PLACEHOLDER_TIME))),
+]
+
+# Shapes that read every document in range by design: an unanchored, case-insensitive
+# $regex cannot use an index bound, whichever index the planner walks. Reported as
+# expected scans rather than counted as failures.
+EXPECTED_SCANS = {
+    name for name, _, _ in QUERY_SHAPES
+    if name.startswith("users: search") or "substring search" in name
+}
+
+
+async def ensure_indexes(db):
+    """Create every registered index; existing indexes with the same spec are left alone"""
+    for collection, indexes in INDEXES.items():
+        try:
+            await db[collection].create_indexes(indexes)
+        except OperationFailure as e:
+            # e.g. duplicate emails blocking the unique index; keep serving and report it
+            print(f"Could not create indexes on {collection}: {e}")
+    print("Ensured MongoDB indexes")
+
+
+def plan_stages(plan: dict) -> list[str]:
+    """Flatten the stage names of an explain() winning plan"""
+    # Servers running the slot-based engine nest the classic plan under queryPlan
+    plan = plan.get("queryPlan", plan)
+    stages = [plan.get("stage", "UNKNOWN")]
+    if "inputStage" in plan:
+        stages += plan_stages(plan["inputStage"])
+    for child in plan.get("inputStages", []):
+        stages += plan_stages(child)
+    return stages
+
+
+async def explain_query_shapes(db) -> list[dict]:
+    """Explain every registered query shape and report the stages of its winning plan"""
+    report = []
+    for name, collection, shape in QUERY_SHAPES:
+        if "pipeline" in shape:
+            command = {"aggregate": collection, "pipeline": shape["pipeline"], "cursor": {}}
+        else:
+            command = {"find": collection, **shape}
+        explain = await db.command("explain", command, verbosity="queryPlanner")
+        # A pipeline's query runs in its leading $cursor stage unless it was pushed down whole
+        planner = explain.get("queryPlanner") or explain["stages"][0]["$cursor"]["queryPlanner"]
+        stages = plan_stages(planner["winningPlan"])
+        report.append({
+            "name": name,
+            "collection": collection,
+            "stages": stages,
+            "collscan": "COLLSCAN" in stages,
+            "expected_scan": name in EXPECTED_SCANS,
+        })
+    return report
@@ -1,17 +1,39 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware import Middleware
+import asyncio
 from contextlib import asynccontextmanager
-from app.database import connect_to_mongo, close_mongo_connection
-from app.routers import auth, users, projects, requests, tasks, plans
+from app.database import connect_to_mongo, close_mongo_connection, get_database
+from app.indexes import ensure_indexes
+from app.utils.auth import password_hasher
+from app.utils.storage import UploadSizeLimitMiddleware
+from app.utils.responses import FastJSONResponse
+from app.utils.metrics import MetricsMiddleware, metrics_response
+from app.utils.traffic import TrafficCaptureMiddleware, shutdown_capture
+from app.config import settings
+from app.utils.blobs import run_garbage_collector
+from app.utils.user_cache import watch_invalidations
+from app.utils.slow_queries import run_slow_query_recorder
+from app.utils import archives
+from app.routers import auth, users, projects, requests, tasks, plans, admin
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await connect_to_mongo()
+    await ensure_indexes(get_database())
+    blob_gc = asyncio.create_task(run_garbage_collector(get_database()))
+    cache_watcher = asyncio.create_task(watch_invalidations(get_database()))
+    slow_query_recorder = asyncio.create_task(run_slow_query_recorder(get_database()))
     yield
     # Shutdown
+    blob_gc.cancel()
+    cache_watcher.cancel()
+    slow_query_recorder.cancel()
+    password_hasher.shutdown()
+    archives.shutdown_pool()
+    shutdown_capture()
     await close_mongo_connection()
 
 
@@ -19,9 +41,17 @@ app = FastAPI(
     title="Marketplace Project Workflow API",
     description="Role-based project marketplace workflow system",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
+# Caps submission uploads while they stream in
+app.add_middleware(UploadSizeLimitMiddleware)
+
+# Records sanitized request metadata for benchmarks.replay
+if settings.traffic_capture_dir:
+    app.add_middleware(TrafficCaptureMiddleware, sample_rate=settings.traffic_capture_sample_rate)
+
 # CORS middleware - MUST be added before other middleware
 app.add_middleware(
     CORSMiddleware,
@@ -54,6 +84,9 @@ app.add_middleware(
     max_age=3600,
 )
 
+# Outermost, so latency and status codes include every other middleware
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(users.router)
@@ -61,6 +94,7 @@ app.include_router(projects.router)
 app.include_router(requests.router)
 app.include_router(tasks.router)
 app.include_router(plans.router)
+app.include_router(admin.router)
 
 
 @app.get("/")
@@ -76,3 +110,7 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return metrics_response()
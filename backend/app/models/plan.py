@@ -50,6 +50,8 @@ class Plan(PlanBase):
     solver_id: str
     status: Literal["pending", "approved", "rejected", "completed"] = "pending"
     progress_percentage: float = 0.0
+    milestones_total: int = 0
+    milestones_completed: int = 0
     approved_at: Optional[datetime] = None
     approved_by: Optional[str] = None
     rejection_reason: Optional[str] = None
@@ -66,3 +68,11 @@ class MilestoneUpdate(BaseModel):
     status: Optional[Literal["pending", "in_progress", "completed", "rejected"]] = None
     notes: Optional[str] = None
     completed_at: Optional[datetime] = None
+
+
+class MilestoneBulkItem(MilestoneUpdate):
+    id: str
+
+
+class MilestoneBulkUpdate(BaseModel):
+    updates: list[MilestoneBulkItem]
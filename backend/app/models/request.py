@@ -16,7 +16,7 @@ class RequestCreate(RequestBase):
 class Request(RequestBase):
     id: str
     solver_id: str
-    status: Literal["pending", "accepted", "rejected"] = "pending"
+    status: Literal["accepted", "rejected"] = "pending"
     created_at: datetime
     updated_at: datetime
     solver_email: Optional[str] = None
@@ -29,5 +29,5 @@ class Request(RequestBase):
 
 
 class RequestUpdate(BaseModel):
-    status: Literal["pending", "accepted", "rejected"]
+    status: Literal["accepted", "rejected"]
 
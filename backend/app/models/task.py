@@ -29,6 +29,10 @@ class Task(TaskBase):
     solver_id: str
     status: Literal["pending", "in_progress", "submitted", "completed", "rejected"] = "pending"
     submission_file: Optional[str] = None
+    submission_filename: Optional[str] = None
+    submission_size: Optional[int] = None
+    submission_sha256: Optional[str] = None
+    submission_manifest: Optional[dict] = None
     submission_date: Optional[datetime] = None
     review_comment: Optional[str] = None
     created_at: datetime
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, Query
+from typing import Optional
+from app.models.user import User
+from app.utils.auth import require_role
+from app.utils.slow_queries import SLOW_QUERY_COLLECTION, slow_query_listener
+from app.config import settings
+from app.database import get_database
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+@router.get("/slow-queries")
+async def get_slow_queries(
+    route: Optional[str] = Query(None, description="Route template, e.g. /projects/search/"),
+    collection: Optional[str] = Query(None, description="Collection the command ran against"),
+    min_duration_ms: Optional[float] = Query(None, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    current_user: User = Depends(require_role(["admin"]))
+):
+    """Admin only: Most recent Mongo commands slower than the threshold, newest first"""
+    db = get_database()
+
+    query = {}
+    if route:
+        query["route"] = route
+    if collection:
+        query["collection"] = collection
+    if min_duration_ms is not None:
+        query["duration_ms"] = {"$gte": min_duration_ms}
+
+    # Capped collections keep insertion order, so reverse natural order is newest first
+    docs = await db[SLOW_QUERY_COLLECTION].find(query).sort("$natural", -1).limit(limit).to_list(length=None)
+    for doc in docs:
+        doc["id"] = str(doc.pop("_id"))
+
+    return {
+        "threshold_ms": settings.slow_query_threshold_ms,
+        "dropped": slow_query_listener.dropped,
+        "items": docs,
+    }
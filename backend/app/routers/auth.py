@@ -1,8 +1,10 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordRequestForm
 from datetime import datetime, timedelta
+from pymongo.errors import DuplicateKeyError
 from app.models.user import UserCreate, User, Token
-from app.utils.auth import get_password_hash, verify_password, create_access_token, get_current_user
+from app.utils.auth import get_password_hash_async, verify_password_async, create_access_token, get_current_user
+from app.utils.user_cache import user_cache
 from app.database import get_database
 from app.config import settings
 
@@ -23,13 +25,20 @@ async def register(user: UserCreate):
     
     # Create new user
     user_dict = user.model_dump()
-    user_dict["hashed_password"] = get_password_hash(user_dict.pop("password"))
+    user_dict["hashed_password"] = await get_password_hash_async(user_dict.pop("password"))
     user_dict["created_at"] = datetime.utcnow()
     user_dict["updated_at"] = datetime.utcnow()
     user_dict["profile"] = None
     
-    result = await db.users.insert_one(user_dict)
+    try:
+        result = await db.users.insert_one(user_dict)
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
     created_user = await db.users.find_one({"_id": result.inserted_id})
+    user_cache.put(str(result.inserted_id), created_user)
     created_user["id"] = str(created_user.pop("_id"))
     created_user.pop("hashed_password", None)
 
@@ -41,7 +50,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     db = get_database()
     
     user = await db.users.find_one({"email": form_data.username})
-    if not user or not verify_password(form_data.password, user["hashed_password"]):
+    if not user or not await verify_password_async(form_data.password, user["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -1,11 +1,19 @@
+import asyncio
 from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
 from datetime import datetime
 from bson import ObjectId
-from app.models.plan import Plan, PlanCreate, PlanUpdate, Milestone, MilestoneUpdate
+from pymongo import ReturnDocument
+from app.models.plan import Plan, PlanCreate, PlanUpdate, Milestone, MilestoneUpdate, MilestoneBulkUpdate
 from app.models.user import User
+from app.models.page import Page
 from app.utils.auth import get_current_user, require_role
-from app.database import get_database
+from app.utils.pagination import PageParams, find_page, split_page
+from app.utils.responses import trusted_page
+from app.utils.ownership import OwnershipChain, OwnershipResolver
+from app.utils.loaders import UserLoader
+from app.utils.party_details import copy_party
+from app.utils.plan_progress import adjust_plan_progress, completed_delta
+from app.database import get_database, run_transaction
 
 router = APIRouter(prefix="/plans", tags=["Plans"])
 
@@ -31,104 +39,149 @@ async def create_plan(
         raise HTTPException(status_code=403, detail="Not authorized")
     
     # Create plan document
+    now = datetime.utcnow()
     plan_dict = plan.model_dump()
+    plan_dict["_id"] = ObjectId()
     plan_dict["solver_id"] = current_user.id
     plan_dict["status"] = "pending"
     plan_dict["progress_percentage"] = 0.0
-    plan_dict["created_at"] = datetime.utcnow()
-    plan_dict["updated_at"] = datetime.utcnow()
-    
-    result = await db.plans.insert_one(plan_dict)
-    created_plan = await db.plans.find_one({"_id": result.inserted_id})
-    created_plan["id"] = str(created_plan.pop("_id"))
-    
-    return Plan(**created_plan)
+    plan_dict["milestones_total"] = len(plan.milestones)
+    plan_dict["milestones_completed"] = 0
+    plan_dict["created_at"] = now
+    plan_dict["updated_at"] = now
+    
+    await db.plans.insert_one(plan_dict)
+    
+    # Materialize the milestones so they can be tracked individually
+    if plan.milestones:
+        await db.milestones.insert_many([
+            {
+                **milestone.model_dump(),
+                "plan_id": str(plan_dict["_id"]),
+                "status": "pending",
+                "completed_at": None,
+                "notes": None,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for milestone in plan.milestones
+        ])
+    
+    plan_dict["id"] = str(plan_dict.pop("_id"))
+    return Plan(**plan_dict)
 
 
-@router.get("/request/{request_id}", response_model=List[Plan])
+@router.get("/request/{request_id}", response_model=Page[Plan])
 async def get_plans_for_request(
     request_id: str,
+    page: PageParams = Depends(),
+    ownership: OwnershipResolver = Depends(),
     current_user: User = Depends(get_current_user)
 ):
     """Get all plans for a specific request"""
     db = get_database()
     
-    if not ObjectId.is_valid(request_id):
-        raise HTTPException(status_code=400, detail="Invalid request ID")
-    
-    # Verify access to request
-    request_obj = await db.requests.find_one({"_id": ObjectId(request_id)})
-    if not request_obj:
-        raise HTTPException(status_code=404, detail="Request not found")
-    
     # Only request solver, project buyer, or admin can view
-    project_obj = await db.projects.find_one({"_id": ObjectId(request_obj["project_id"])})
-    if not project_obj:
-        raise HTTPException(status_code=404, detail="Project not found")
-    
+    chain = await ownership.for_request(request_id)
     if (current_user.role != "admin" and 
-        current_user.id != request_obj["solver_id"] and 
-        current_user.id != project_obj["buyer_id"]):
+        current_user.id != chain.solver_id and 
+        current_user.id != chain.buyer_id):
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    plans = []
-    async for plan in db.plans.find({"request_id": request_id}):
+    query = {"request_id": request_id}
+    docs, next_cursor = split_page(await find_page(db.plans, query, page).to_list(length=None), page)
+    for plan in docs:
         plan["id"] = str(plan.pop("_id"))
-        plans.append(Plan(**plan))
     
-    return plans
+    return trusted_page(Plan, docs, next_cursor)
 
 
 @router.patch("/{plan_id}/approve", response_model=Plan)
 async def approve_plan(
     plan_id: str,
+    ownership: OwnershipResolver = Depends(),
+    users: UserLoader = Depends(),
     current_user: User = Depends(require_role(["buyer"]))
 ):
     """Buyer: Approve a plan proposal"""
     db = get_database()
     
-    if not ObjectId.is_valid(plan_id):
-        raise HTTPException(status_code=400, detail="Invalid plan ID")
-    
-    plan = await db.plans.find_one({"_id": ObjectId(plan_id)})
-    if not plan:
-        raise HTTPException(status_code=404, detail="Plan not found")
-    
-    request_obj = await db.requests.find_one({"_id": ObjectId(plan["request_id"])})
-    project_obj = await db.projects.find_one({"_id": ObjectId(request_obj["project_id"])})
+    chain = await ownership.for_plan(plan_id)
     
     # Verify buyer ownership
-    if project_obj["buyer_id"] != current_user.id:
+    if chain.buyer_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    # Update plan
-    result = await db.plans.find_one_and_update(
-        {"_id": ObjectId(plan_id)},
-        {"$set": {
-            "status": "approved",
-            "approved_at": datetime.utcnow(),
-            "approved_by": current_user.id,
-            "updated_at": datetime.utcnow()
-        }},
-        return_document=True
-    )
-    
-    # Update request status to accepted
-    await db.requests.update_one(
-        {"_id": ObjectId(plan["request_id"])},
-        {"$set": {"status": "accepted", "updated_at": datetime.utcnow()}}
-    )
-    
-    # Assign solver to project
-    await db.projects.update_one(
-        {"_id": ObjectId(request_obj["project_id"])},
-        {"$set": {
-            "assigned_solver_id": request_obj["solver_id"],
-            "status": "assigned",
-            "updated_at": datetime.utcnow()
-        }}
-    )
-    
+    now = datetime.utcnow()
+    solver_details = await copy_party(chain.request, "solver_id", "solver", users)
+    
+    # Approve the plan, accept its request and assign the project atomically
+    async def approve(session):
+        result = await db.plans.find_one_and_update(
+            {"_id": ObjectId(plan_id), "status": "pending"},
+            {"$set": {
+                "status": "approved",
+                "approved_at": now,
+                "approved_by": current_user.id,
+                "updated_at": now
+            }},
+            return_document=ReturnDocument.AFTER,
+            session=session
+        )
+        if not result:
+            raise HTTPException(status_code=409, detail="Plan is no longer pending")
+        
+        # The project must still be open, or already this solver's: a revised plan for
+        # an assigned or in-progress project keeps the project's status
+        project_filter = {"_id": ObjectId(chain.request["project_id"])}
+        assigned = await db.projects.update_one(
+            {**project_filter, "status": "open"},
+            {"$set": {
+                "assigned_solver_id": chain.solver_id,
+                **solver_details,
+                "status": "assigned",
+                "updated_at": now
+            }},
+            session=session
+        )
+        if not assigned.matched_count:
+            assigned = await db.projects.update_one(
+                {
+                    **project_filter,
+                    "status": {"$in": ["assigned", "in_progress"]},
+                    "assigned_solver_id": chain.solver_id
+                },
+                {"$set": {**solver_details, "updated_at": now}},
+                session=session
+            )
+        if not assigned.matched_count:
+            project = await db.projects.find_one(project_filter, {"status": 1}, session=session)
+            if project and project["status"] in ("completed", "cancelled"):
+                raise HTTPException(status_code=409, detail=f"Project is {project['status']}")
+            raise HTTPException(status_code=409, detail="Project is assigned to another solver")
+        
+        # The request may already be accepted (accept, then plan); a rejected one lost a race
+        accepted = await db.requests.update_one(
+            {"_id": chain.request["_id"], "status": {"$in": ["pending", "accepted"]}},
+            {"$set": {"status": "accepted", "updated_at": now}},
+            session=session
+        )
+        if not accepted.matched_count:
+            raise HTTPException(status_code=409, detail="Request is no longer pending")
+        
+        # Reject all other pending requests, as accepting a request does
+        await db.requests.update_many(
+            {
+                "project_id": chain.request["project_id"],
+                "_id": {"$ne": chain.request["_id"]},
+                "status": "pending"
+            },
+            {"$set": {"status": "rejected", "updated_at": now}},
+            session=session
+        )
+        return result
+    
+    result = await run_transaction(approve)
     result["id"] = str(result.pop("_id"))
     return Plan(**result)
 
@@ -137,23 +190,16 @@ async def approve_plan(
 async def reject_plan(
     plan_id: str,
     reason_data: dict,
+    ownership: OwnershipResolver = Depends(),
     current_user: User = Depends(require_role(["buyer"]))
 ):
     """Buyer: Reject a plan proposal"""
     db = get_database()
     
-    if not ObjectId.is_valid(plan_id):
-        raise HTTPException(status_code=400, detail="Invalid plan ID")
-    
-    plan = await db.plans.find_one({"_id": ObjectId(plan_id)})
-    if not plan:
-        raise HTTPException(status_code=404, detail="Plan not found")
-    
-    request_obj = await db.requests.find_one({"_id": ObjectId(plan["request_id"])})
-    project_obj = await db.projects.find_one({"_id": ObjectId(request_obj["project_id"])})
+    chain = await ownership.for_plan(plan_id)
     
     # Verify buyer ownership
-    if project_obj["buyer_id"] != current_user.id:
+    if chain.buyer_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
     
     reason = reason_data.get("reason", "No reason provided")
@@ -176,63 +222,110 @@ async def reject_plan(
 async def update_milestone(
     milestone_id: str,
     update: MilestoneUpdate,
+    ownership: OwnershipResolver = Depends(),
     current_user: User = Depends(require_role(["problem_solver", "buyer"]))
 ):
     """Solver: Update milestone status; Buyer: Review progress"""
     db = get_database()
     
-    if not ObjectId.is_valid(milestone_id):
-        raise HTTPException(status_code=400, detail="Invalid milestone ID")
-    
-    milestone = await db.milestones.find_one({"_id": ObjectId(milestone_id)})
-    if not milestone:
-        raise HTTPException(status_code=404, detail="Milestone not found")
-    
-    # Verify access
-    plan = await db.plans.find_one({"_id": ObjectId(milestone["plan_id"])})
-    request_obj = await db.requests.find_one({"_id": ObjectId(plan["request_id"])})
-    project = await db.projects.find_one({"_id": ObjectId(request_obj["project_id"])})
-    
     # Only solver or buyer can update
-    if (current_user.role == "problem_solver" and current_user.id != plan["solver_id"]):
-        raise HTTPException(status_code=403, detail="Not authorized")
-    if (current_user.role == "buyer" and current_user.id != project["buyer_id"]):
-        raise HTTPException(status_code=403, detail="Not authorized")
+    chain = await ownership.for_milestone(milestone_id)
+    _check_tracking_access(chain, current_user)
     
     update_data = update.model_dump(exclude_unset=True)
     update_data["updated_at"] = datetime.utcnow()
     
-    result = await db.milestones.find_one_and_update(
+    # The pre-update document gives the exact status this write replaced
+    previous = await db.milestones.find_one_and_update(
         {"_id": ObjectId(milestone_id)},
         {"$set": update_data},
-        return_document=True
+        return_document=ReturnDocument.BEFORE
     )
+    if not previous:
+        raise HTTPException(status_code=404, detail="Milestone not found")
     
-    # Recalculate plan progress
-    await recalculate_plan_progress(plan["_id"])
+    # Adjust the plan's counters only when completion changed
+    if "status" in update_data:
+        delta = completed_delta(previous.get("status"), update_data["status"])
+        await adjust_plan_progress(db, previous["plan_id"], completed=delta)
     
+    result = {**previous, **update_data}
     result["id"] = str(result.pop("_id"))
     return Milestone(**result)
 
 
-async def recalculate_plan_progress(plan_id):
-    """Calculate progress percentage based on completed milestones"""
-    db = get_database()
-    
+def _check_tracking_access(chain: OwnershipChain, current_user: User):
+    """Only the plan's solver or the project's buyer may track its milestones"""
+    if (current_user.role == "problem_solver" and current_user.id != chain.plan["solver_id"]):
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if (current_user.role == "buyer" and current_user.id != chain.buyer_id):
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+
+async def _plan_milestones(db, plan_id: str) -> list[Milestone]:
     milestones = []
-    async for milestone in db.milestones.find({"plan_id": str(plan_id)}):
-        milestones.append(milestone)
-    
-    if not milestones:
-        progress = 0.0
-    else:
-        completed = sum(1 for m in milestones if m.get("status") == "completed")
-        progress = (completed / len(milestones)) * 100
-    
-    await db.plans.update_one(
-        {"_id": plan_id},
-        {"$set": {
-            "progress_percentage": progress,
-            "updated_at": datetime.utcnow()
-        }}
-    )
+    async for milestone in db.milestones.find({"plan_id": plan_id}).sort([("created_at", 1), ("_id", 1)]):
+        milestone["id"] = str(milestone.pop("_id"))
+        milestones.append(Milestone(**milestone))
+    return milestones
+
+
+@router.get("/{plan_id}/milestones", response_model=list[Milestone])
+async def get_plan_milestones(
+    plan_id: str,
+    ownership: OwnershipResolver = Depends(),
+    current_user: User = Depends(require_role(["problem_solver", "buyer"]))
+):
+    """Solver/Buyer: Get the tracked milestones of a plan"""
+    db = get_database()
+    _check_tracking_access(await ownership.for_plan(plan_id), current_user)
+    return await _plan_milestones(db, plan_id)
+
+
+@router.patch("/{plan_id}/milestones", response_model=list[Milestone])
+async def bulk_update_milestones(
+    plan_id: str,
+    bulk: MilestoneBulkUpdate,
+    ownership: OwnershipResolver = Depends(),
+    current_user: User = Depends(require_role(["problem_solver", "buyer"]))
+):
+    """Solver/Buyer: Update many milestones of a plan in one request"""
+    db = get_database()
+    _check_tracking_access(await ownership.for_plan(plan_id), current_user)
+    
+    for item in bulk.updates:
+        if not ObjectId.is_valid(item.id):
+            raise HTTPException(status_code=400, detail=f"Invalid milestone ID: {item.id}")
+    
+    # Every id must belong to this plan before anything is written
+    requested = {ObjectId(item.id) for item in bulk.updates}
+    if requested:
+        found = {doc["_id"] async for doc in db.milestones.find(
+            {"_id": {"$in": list(requested)}, "plan_id": plan_id}, {"_id": 1}
+        )}
+        if found != requested:
+            raise HTTPException(status_code=404, detail="Some milestones were not found in this plan")
+    
+    now = datetime.utcnow()
+    
+    async def apply(item) -> int:
+        update_data = item.model_dump(exclude_unset=True, exclude={"id"})
+        update_data["updated_at"] = now
+        # Still scoped to the plan, should a milestone be moved in between; the
+        # pre-update document gives the status this write replaced
+        previous = await db.milestones.find_one_and_update(
+            {"_id": ObjectId(item.id), "plan_id": plan_id},
+            {"$set": update_data},
+            {"status": 1},
+            return_document=ReturnDocument.BEFORE
+        )
+        if not previous or "status" not in update_data:
+            return 0
+        return completed_delta(previous.get("status"), update_data["status"])
+    
+    # One counter adjustment for the whole batch, made of the same deltas the
+    # single-milestone update applies, so concurrent updates are never overwritten
+    deltas = await asyncio.gather(*(apply(item) for item in bulk.updates))
+    await adjust_plan_progress(db, plan_id, completed=sum(deltas))
+    
+    return await _plan_milestones(db, plan_id)
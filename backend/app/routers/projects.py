@@ -1,15 +1,23 @@
 from fastapi import APIRouter, HTTPException, status, Depends, Query
-from typing import List, Optional
+from functools import partial
+from typing import Literal, Optional
 from datetime import datetime
 from bson import ObjectId
 from app.models.project import Project, ProjectCreate, ProjectUpdate
 from app.models.user import User
+from app.models.page import Page
 from app.utils.auth import get_current_user, require_role
+from app.utils.pagination import PageParams, encode_score_cursor, find_page, split_page, text_page_stages
+from app.utils.transitions import transition
+from app.utils.loaders import UserLoader
+from app.utils.party_details import fill_missing_details, party_fields
+from app.utils.streaming import StreamParams, stream_documents
+from app.utils.responses import trusted_page
+from app.utils.search import project_substring_query, visible_projects
 from app.database import get_database
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
-
 @router.post("/", response_model=Project, status_code=status.HTTP_201_CREATED)
 async def create_project(
     project: ProjectCreate,
@@ -22,6 +30,8 @@ async def create_project(
     project_dict["buyer_id"] = current_user.id
     project_dict["status"] = "open"
     project_dict["assigned_solver_id"] = None
+    # Listings show the parties without joining users
+    project_dict.update(party_fields("buyer", current_user.model_dump()))
     project_dict["created_at"] = datetime.utcnow()
     project_dict["updated_at"] = datetime.utcnow()
     
@@ -32,51 +42,37 @@ async def create_project(
     return Project(**created_project)
 
 
-@router.get("/", response_model=List[Project])
-async def get_projects(current_user: User = Depends(get_current_user)):
-    """Get projects based on user role"""
+@router.get("/", response_model=Page[Project])
+async def get_projects(
+    page: PageParams = Depends(),
+    users: UserLoader = Depends(),
+    stream: StreamParams = Depends(),
+    current_user: User = Depends(get_current_user)
+):
+    """Get projects based on user role (streams every project with Accept: application/x-ndjson or ?stream=1)"""
     db = get_database()
-    projects = []
     
-    if current_user.role == "admin":
-        # Admin sees all projects
-        cursor = db.projects.find()
-    elif current_user.role == "buyer":
-        # Buyer sees their own projects
-        cursor = db.projects.find({"buyer_id": current_user.id})
-    else:  # problem_solver
-        # Problem solver sees open projects and their assigned projects
-        cursor = db.projects.find({
-            "$or": [
-                {"status": "open"},
-                {"assigned_solver_id": current_user.id}
-            ]
-        })
-    
-    async for project in cursor:
-        project["id"] = str(project.pop("_id"))
+    query = visible_projects(current_user.role, current_user.id)
 
-        # Populate buyer details
-        if project.get("buyer_id"):
-            buyer = await db.users.find_one({"_id": ObjectId(project["buyer_id"])})
-            if buyer:
-                project["buyer_email"] = buyer.get("email")
-                project["buyer_name"] = buyer.get("full_name")
+    if stream.format:
+        prepare = partial(fill_missing_details, "projects", loader=users)
+        return stream_documents(db.projects, query, Project, stream, page.cursor, prepare=prepare)
 
-        # Populate solver details if assigned
-        if project.get("assigned_solver_id"):
-            solver = await db.users.find_one({"_id": ObjectId(project["assigned_solver_id"])})
-            if solver:
-                project["solver_email"] = solver.get("email")
-                project["solver_name"] = solver.get("full_name")
-
-        projects.append(Project(**project))
+    docs, next_cursor = split_page(await find_page(db.projects, query, page).to_list(length=None), page)
+    await fill_missing_details("projects", docs, users)
+    for project in docs:
+        project["id"] = str(project.pop("_id"))
 
-    return projects
+    # Documents from our own collection are encoded without re-validation
+    return trusted_page(Project, docs, next_cursor)
 
 
 @router.get("/{project_id}", response_model=Project)
-async def get_project(project_id: str, current_user: User = Depends(get_current_user)):
+async def get_project(
+    project_id: str,
+    users: UserLoader = Depends(),
+    current_user: User = Depends(get_current_user)
+):
     """Get a specific project"""
     db = get_database()
     
@@ -87,22 +83,8 @@ async def get_project(project_id: str, current_user: User = Depends(get_current_
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
+    await fill_missing_details("projects", [project], users)
     project["id"] = str(project.pop("_id"))
-
-    # Populate buyer details
-    if project.get("buyer_id"):
-        buyer = await db.users.find_one({"_id": ObjectId(project["buyer_id"])})
-        if buyer:
-            project["buyer_email"] = buyer.get("email")
-            project["buyer_name"] = buyer.get("full_name")
-
-    # Populate solver details if assigned
-    if project.get("assigned_solver_id"):
-        solver = await db.users.find_one({"_id": ObjectId(project["assigned_solver_id"])})
-        if solver:
-            project["solver_email"] = solver.get("email")
-            project["solver_name"] = solver.get("full_name")
-
     return Project(**project)
 
 
@@ -170,17 +152,6 @@ async def update_project_status(
     """Admin or Buyer (creator): Change project status"""
     db = get_database()
     
-    if not ObjectId.is_valid(project_id):
-        raise HTTPException(status_code=400, detail="Invalid project ID")
-    
-    project = await db.projects.find_one({"_id": ObjectId(project_id)})
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-    
-    # Check authorization: admin or buyer (creator)
-    if current_user.role != "admin" and project["buyer_id"] != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to update this project")
-    
     new_status = status_update.get("status")
     if not new_status:
         raise HTTPException(status_code=400, detail="Status is required")
@@ -188,14 +159,9 @@ async def update_project_status(
     if new_status not in ["open", "assigned", "in_progress", "completed", "cancelled"]:
         raise HTTPException(status_code=400, detail="Invalid status")
     
-    result = await db.projects.find_one_and_update(
-        {"_id": ObjectId(project_id)},
-        {"$set": {
-            "status": new_status,
-            "updated_at": datetime.utcnow()
-        }},
-        return_document=True
-    )
+    # Check authorization: admin or buyer (creator)
+    owner_field = None if current_user.role == "admin" else "buyer_id"
+    result = await transition(db, "projects", project_id, current_user, new_status, owner_field=owner_field)
     
     result["id"] = str(result.pop("_id"))
     return Project(**result)
@@ -245,62 +211,35 @@ async def update_project_deadline(
     return Project(**result)
 
 
-@router.get("/search/", response_model=List[Project])
+@router.get("/search/", response_model=Page[Project])
 async def search_projects(
     q: Optional[str] = Query(None, description="Search query for title or description"),
+    mode: Literal["text", "regex"] = Query("text", description="text: ranked full-text search; regex: substring match"),
+    page: PageParams = Depends(),
+    users: UserLoader = Depends(),
     current_user: User = Depends(get_current_user)
 ):
-    """Search projects by title or description"""
+    """Search projects by title, description or requirements"""
     db = get_database()
-    projects = []
 
-    # Build base query based on user role
-    if current_user.role == "admin":
-        base_query = {}
-    elif current_user.role == "buyer":
-        base_query = {"buyer_id": current_user.id}
-    else:  # problem_solver
-        base_query = {
-            "$or": [
-                {"status": "open"},
-                {"assigned_solver_id": current_user.id}
-            ]
-        }
+    base_query = visible_projects(current_user.role, current_user.id)
 
-    # Add search criteria if query provided
-    if q and q.strip():
-        search_query = {
-            "$and": [
-                base_query,
-                {
-                    "$or": [
-                        {"title": {"$regex": q, "$options": "i"}},
-                        {"description": {"$regex": q, "$options": "i"}}
-                    ]
-                }
-            ]
-        }
+    if q and q.strip() and mode == "text":
+        # Ranked by the weighted project_search text index
+        pipeline = text_page_stages(base_query, q.strip(), page)
+        docs, next_cursor = split_page(
+            await db.projects.aggregate(pipeline).to_list(length=None), page, encode=encode_score_cursor
+        )
     else:
-        search_query = base_query
+        if q and q.strip():
+            search_query = project_substring_query(base_query, q)
+        else:
+            search_query = base_query
 
-    cursor = db.projects.find(search_query)
-    async for project in cursor:
-        project["id"] = str(project.pop("_id"))
-
-        # Populate buyer details
-        if project.get("buyer_id"):
-            buyer = await db.users.find_one({"_id": ObjectId(project["buyer_id"])})
-            if buyer:
-                project["buyer_email"] = buyer.get("email")
-                project["buyer_name"] = buyer.get("full_name")
+        docs, next_cursor = split_page(await find_page(db.projects, search_query, page).to_list(length=None), page)
 
-        # Populate solver details if assigned
-        if project.get("assigned_solver_id"):
-            solver = await db.users.find_one({"_id": ObjectId(project["assigned_solver_id"])})
-            if solver:
-                project["solver_email"] = solver.get("email")
-                project["solver_name"] = solver.get("full_name")
-
-        projects.append(Project(**project))
+    await fill_missing_details("projects", docs, users)
+    for project in docs:
+        project["id"] = str(project.pop("_id"))
 
-    return projects
+    return trusted_page(Project, docs, next_cursor)
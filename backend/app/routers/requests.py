@@ -1,11 +1,17 @@
 from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
 from datetime import datetime
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 from app.models.request import Request, RequestCreate, RequestUpdate
 from app.models.user import User
+from app.models.page import Page
 from app.utils.auth import get_current_user, require_role
-from app.database import get_database
+from app.utils.pagination import PageParams, find_page, split_page
+from app.utils.responses import trusted_page
+from app.utils.transitions import transition
+from app.utils.loaders import UserLoader
+from app.utils.party_details import copy_party, fill_missing_details, party_fields
+from app.database import get_database, run_transaction
 
 router = APIRouter(prefix="/requests", tags=["Requests"])
 
@@ -13,6 +19,7 @@ router = APIRouter(prefix="/requests", tags=["Requests"])
 @router.post("/", response_model=Request, status_code=status.HTTP_201_CREATED)
 async def create_request(
     request: RequestCreate,
+    users: UserLoader = Depends(),
     current_user: User = Depends(require_role(["problem_solver"]))
 ):
     """Problem solver: Request to work on a project"""
@@ -38,20 +45,31 @@ async def create_request(
     
     request_dict = request.model_dump()
     request_dict["solver_id"] = current_user.id
+    # Kept on the request so the buyer's decision can check ownership in the update filter
+    request_dict["buyer_id"] = project["buyer_id"]
+    # Listings show the parties without joining users
+    request_dict.update(party_fields("solver", current_user.model_dump()))
+    request_dict.update(await copy_party(project, "buyer_id", "buyer", users))
     request_dict["status"] = "pending"
     request_dict["created_at"] = datetime.utcnow()
     request_dict["updated_at"] = datetime.utcnow()
     
-    result = await db.requests.insert_one(request_dict)
+    try:
+        result = await db.requests.insert_one(request_dict)
+    except DuplicateKeyError:
+        # A concurrent request from the same solver won the race
+        raise HTTPException(status_code=400, detail="Already requested this project")
     created_request = await db.requests.find_one({"_id": result.inserted_id})
     created_request["id"] = str(created_request.pop("_id"))
 
     return Request(**created_request)
 
 
-@router.get("/project/{project_id}", response_model=List[Request])
+@router.get("/project/{project_id}", response_model=Page[Request])
 async def get_project_requests(
     project_id: str,
+    page: PageParams = Depends(),
+    users: UserLoader = Depends(),
     current_user: User = Depends(require_role(["buyer", "admin"]))
 ):
     """Buyer/Admin: Get all requests for a project"""
@@ -66,69 +84,67 @@ async def get_project_requests(
         if not project or project["buyer_id"] != current_user.id:
             raise HTTPException(status_code=403, detail="Not authorized")
     
-    requests = []
-    async for req in db.requests.find({"project_id": project_id}):
+    query = {"project_id": project_id}
+    docs, next_cursor = split_page(await find_page(db.requests, query, page).to_list(length=None), page)
+    # Requests written before party details were stored get them in one users query
+    await fill_missing_details("requests", docs, users)
+    for req in docs:
         req["id"] = str(req.pop("_id"))
 
-        # Populate solver details
-        if req.get("solver_id"):
-            solver = await db.users.find_one({"_id": ObjectId(req["solver_id"])})
-            if solver:
-                req["solver_email"] = solver.get("email")
-                req["solver_name"] = solver.get("full_name")
-
-        requests.append(Request(**req))
-
-    return requests
+    return trusted_page(Request, docs, next_cursor)
 
 
 @router.patch("/{request_id}", response_model=Request)
 async def update_request_status(
     request_id: str,
     request_update: RequestUpdate,
+    users: UserLoader = Depends(),
     current_user: User = Depends(require_role(["buyer"]))
 ):
     """Buyer: Accept or reject a request"""
     db = get_database()
     
-    if not ObjectId.is_valid(request_id):
-        raise HTTPException(status_code=400, detail="Invalid request ID")
-    
-    req = await db.requests.find_one({"_id": ObjectId(request_id)})
-    if not req:
-        raise HTTPException(status_code=404, detail="Request not found")
-    
-    # Verify project ownership
-    project = await db.projects.find_one({"_id": ObjectId(req["project_id"])})
-    if not project or project["buyer_id"] != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
-    # Update request
-    result = await db.requests.find_one_and_update(
-        {"_id": ObjectId(request_id)},
-        {"$set": {"status": request_update.status, "updated_at": datetime.utcnow()}},
-        return_document=True
-    )
-    
-    # If accepted, assign solver to project and reject other requests
-    if request_update.status == "accepted":
-        await db.projects.update_one(
-            {"_id": ObjectId(req["project_id"])},
-            {"$set": {
-                "assigned_solver_id": req["solver_id"],
-                "status": "assigned",
-                "updated_at": datetime.utcnow()
-            }}
-        )
-        # Reject all other pending requests
-        await db.requests.update_many(
-            {
-                "project_id": req["project_id"],
-                "_id": {"$ne": ObjectId(request_id)},
-                "status": "pending"
-            },
-            {"$set": {"status": "rejected", "updated_at": datetime.utcnow()}}
+    if request_update.status != "accepted":
+        result = await transition(
+            db, "requests", request_id, current_user, request_update.status, owner_field="buyer_id"
         )
+    else:
+        # Accept the request, assign the solver and reject the others atomically
+        async def accept(session):
+            accepted = await transition(
+                db, "requests", request_id, current_user, "accepted",
+                owner_field="buyer_id", session=session
+            )
+            now = accepted["updated_at"]
+            solver_details = await copy_party(accepted, "solver_id", "solver", users)
+            
+            # Only an open project can be assigned, so concurrent accepts have one winner
+            assigned = await db.projects.update_one(
+                {"_id": ObjectId(accepted["project_id"]), "status": "open"},
+                {"$set": {
+                    "assigned_solver_id": accepted["solver_id"],
+                    **solver_details,
+                    "status": "assigned",
+                    "updated_at": now
+                }},
+                session=session
+            )
+            if not assigned.modified_count:
+                raise HTTPException(status_code=409, detail="Project is no longer open")
+            
+            # Reject all other pending requests
+            await db.requests.update_many(
+                {
+                    "project_id": accepted["project_id"],
+                    "_id": {"$ne": accepted["_id"]},
+                    "status": "pending"
+                },
+                {"$set": {"status": "rejected", "updated_at": now}},
+                session=session
+            )
+            return accepted
+        
+        result = await run_transaction(accept)
     
     result["id"] = str(result.pop("_id"))
     return Request(**result)
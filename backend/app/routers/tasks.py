@@ -1,15 +1,24 @@
-from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File
-from fastapi.responses import FileResponse
-from typing import List
+from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File, Request, BackgroundTasks
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument
+import mimetypes
 import os
-import shutil
+import zipfile
 from app.models.task import Task, TaskCreate, TaskUpdate
 from app.models.user import User
+from app.models.page import Page
 from app.utils.auth import get_current_user, require_role
+from app.utils.storage import discard_file
+from app.utils.blobs import is_blob_path, release_blob, store_blob
+from app.utils.downloads import file_download_response, offloaded_download_response, content_disposition
+from app.utils.archives import READ_CHUNK_SIZE, index_submission, open_entry
+from app.utils.pagination import PageParams, find_page, split_page
+from app.utils.responses import trusted_page
+from app.utils.transitions import transition
 from app.database import get_database
-from app.config import settings
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
@@ -34,6 +43,8 @@ async def create_task(
     
     task_dict = task.model_dump()
     task_dict["solver_id"] = current_user.id
+    # Kept on the task so reviews can check ownership in the update filter
+    task_dict["buyer_id"] = project["buyer_id"]
     task_dict["status"] = "pending"
     task_dict["submission_file"] = None
     task_dict["submission_date"] = None
@@ -48,9 +59,10 @@ async def create_task(
     return Task(**created_task)
 
 
-@router.get("/project/{project_id}", response_model=List[Task])
+@router.get("/project/{project_id}", response_model=Page[Task])
 async def get_project_tasks(
     project_id: str,
+    page: PageParams = Depends(),
     current_user: User = Depends(get_current_user)
 ):
     """Get all tasks for a project"""
@@ -69,12 +81,14 @@ async def get_project_tasks(
     if current_user.role == "problem_solver" and project["assigned_solver_id"] != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    tasks = []
-    async for task in db.tasks.find({"project_id": project_id}):
+    query = {"project_id": project_id}
+    # Listings carry the manifest summary only; entries are fetched per task
+    projection = {"submission_manifest.entries": 0}
+    docs, next_cursor = split_page(await find_page(db.tasks, query, page, projection).to_list(length=None), page)
+    for task in docs:
         task["id"] = str(task.pop("_id"))
-        tasks.append(Task(**task))
 
-    return tasks
+    return trusted_page(Task, docs, next_cursor)
 
 
 @router.patch("/{task_id}", response_model=Task)
@@ -86,22 +100,12 @@ async def update_task(
     """Problem solver: Update task"""
     db = get_database()
     
-    if not ObjectId.is_valid(task_id):
-        raise HTTPException(status_code=400, detail="Invalid task ID")
+    update_data = task_update.model_dump(exclude_unset=True)
+    new_status = update_data.pop("status", None)
     
-    task = await db.tasks.find_one({"_id": ObjectId(task_id)})
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    if task["solver_id"] != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
-    update_data = {k: v for k, v in task_update.model_dump(exclude_unset=True).items()}
-    update_data["updated_at"] = datetime.utcnow()
-    
-    result = await db.tasks.find_one_and_update(
-        {"_id": ObjectId(task_id)},
-        {"$set": update_data},
-        return_document=True
+    result = await transition(
+        db, "tasks", task_id, current_user, new_status,
+        owner_field="solver_id", changes=update_data
     )
 
     result["id"] = str(result.pop("_id"))
@@ -111,6 +115,7 @@ async def update_task(
 @router.post("/{task_id}/submit", response_model=Task)
 async def submit_task(
     task_id: str,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     current_user: User = Depends(require_role(["problem_solver"]))
 ):
@@ -130,27 +135,40 @@ async def submit_task(
     if task["solver_id"] != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    # Create upload directory if not exists
-    upload_dir = os.path.join(settings.upload_dir, task_id)
-    os.makedirs(upload_dir, exist_ok=True)
-
-    # Save file
-    file_path = os.path.join(upload_dir, file.filename)
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-
-    # Update task
-    result = await db.tasks.find_one_and_update(
+    # Stream the file into the content-addressed blob store
+    stored = await store_blob(db, file)
+
+    # Update task, keeping the previous submission so its storage can be released
+    update_data = {
+        "status": "submitted",
+        "submission_file": stored.path,
+        "submission_filename": os.path.basename(file.filename),
+        "submission_size": stored.size,
+        "submission_sha256": stored.sha256,
+        "submission_date": datetime.utcnow(),
+        "updated_at": datetime.utcnow()
+    }
+    previous = await db.tasks.find_one_and_update(
         {"_id": ObjectId(task_id)},
-        {"$set": {
-            "status": "submitted",
-            "submission_file": file_path,
-            "submission_date": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
-        }},
-        return_document=True
+        {"$set": update_data},
+        return_document=ReturnDocument.BEFORE
     )
+    if not previous:
+        await release_blob(db, stored.sha256)
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    # Release the superseded submission
+    previous_file = previous.get("submission_file")
+    if previous_file and is_blob_path(previous_file):
+        await release_blob(db, previous["submission_sha256"])
+    elif previous_file:
+        # Submitted before the blob store existed
+        background_tasks.add_task(discard_file, previous_file)
 
+    # Validate the archive and record its manifest off the event loop
+    background_tasks.add_task(index_submission, db, task_id, stored.path, stored.sha256)
+
+    result = {**previous, **update_data}
     result["id"] = str(result.pop("_id"))
     return Task(**result)
 
@@ -165,43 +183,18 @@ async def review_task(
     """Buyer: Accept or reject task submission"""
     db = get_database()
 
-    if not ObjectId.is_valid(task_id):
-        raise HTTPException(status_code=400, detail="Invalid task ID")
-
-    task = await db.tasks.find_one({"_id": ObjectId(task_id)})
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-
-    # Verify project ownership
-    project = await db.projects.find_one({"_id": ObjectId(task["project_id"])})
-    if not project or project["buyer_id"] != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized")
-
-    if task["status"] != "submitted":
-        raise HTTPException(status_code=400, detail="Task is not submitted")
-
-    new_status = "completed" if accept else "rejected"
-
-    result = await db.tasks.find_one_and_update(
-        {"_id": ObjectId(task_id)},
-        {"$set": {
-            "status": new_status,
-            "review_comment": comment,
-            "updated_at": datetime.utcnow()
-        }},
-        return_document=True
+    # Only the project's buyer may review, and only a submitted task
+    result = await transition(
+        db, "tasks", task_id, current_user, "completed" if accept else "rejected",
+        owner_field="buyer_id", changes={"review_comment": comment}
     )
 
     result["id"] = str(result.pop("_id"))
     return Task(**result)
 
 
-@router.get("/{task_id}/download")
-async def download_task_file(
-    task_id: str,
-    current_user: User = Depends(require_role(["buyer", "admin"]))
-):
-    """Buyer/Admin: Download submitted task file"""
+async def get_submitted_task(task_id: str, current_user: User) -> dict:
+    """Load a task whose submission the buyer/admin may read, checking the file exists"""
     db = get_database()
 
     if not ObjectId.is_valid(task_id):
@@ -220,14 +213,77 @@ async def download_task_file(
     if not task.get("submission_file"):
         raise HTTPException(status_code=404, detail="No file submitted for this task")
 
-    file_path = task["submission_file"]
-    if not os.path.exists(file_path):
+    if not os.path.exists(task["submission_file"]):
         raise HTTPException(status_code=404, detail="File not found on server")
 
-    filename = os.path.basename(file_path)
-    return FileResponse(
+    return task
+
+
+@router.get("/{task_id}/download")
+async def download_task_file(
+    task_id: str,
+    request: Request,
+    current_user: User = Depends(require_role(["buyer", "admin"]))
+):
+    """Buyer/Admin: Download submitted task file (supports Range and conditional requests)"""
+    task = await get_submitted_task(task_id, current_user)
+    file_path = task["submission_file"]
+    filename = task.get("submission_filename") or os.path.basename(file_path)
+
+    # Authorization is done; let the file server or proxy move the bytes when configured
+    offloaded = offloaded_download_response(file_path, filename, "application/zip")
+    if offloaded is not None:
+        return offloaded
+
+    return await file_download_response(
+        request,
         path=file_path,
         filename=filename,
-        media_type="application/zip"
+        media_type="application/zip",
+        sha256=task.get("submission_sha256"),
     )
 
+
+@router.get("/{task_id}/entries/{entry_path:path}")
+async def preview_task_file_entry(
+    task_id: str,
+    entry_path: str,
+    current_user: User = Depends(require_role(["buyer", "admin"]))
+):
+    """Buyer/Admin: Stream a single file out of the submitted ZIP"""
+    task = await get_submitted_task(task_id, current_user)
+
+    manifest = task.get("submission_manifest")
+    if not manifest:
+        raise HTTPException(status_code=409, detail="Submission is still being indexed")
+    if manifest["status"] == "error":
+        raise HTTPException(status_code=409, detail=f"Submission could not be indexed: {manifest['reason']}")
+    if manifest["status"] != "ok":
+        raise HTTPException(status_code=409, detail=f"Submission was rejected: {manifest['reason']}")
+
+    entry = next((e for e in manifest["entries"] if e["path"] == entry_path), None)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Entry not found in submission")
+
+    try:
+        archive, handle = await run_in_threadpool(open_entry, task["submission_file"], entry_path)
+    except (zipfile.BadZipFile, KeyError):
+        raise HTTPException(status_code=404, detail="Entry not found in submission")
+
+    async def read_entry():
+        try:
+            while chunk := await run_in_threadpool(handle.read, READ_CHUNK_SIZE):
+                yield chunk
+        finally:
+            await run_in_threadpool(handle.close)
+            await run_in_threadpool(archive.close)
+
+    media_type = mimetypes.guess_type(entry_path)[0] or "application/octet-stream"
+    return StreamingResponse(
+        read_entry(),
+        media_type=media_type,
+        headers={
+            "content-length": str(entry["size"]),
+            "content-disposition": content_disposition(os.path.basename(entry_path), "inline"),
+        },
+    )
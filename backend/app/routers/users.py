@@ -1,20 +1,34 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, status, Depends, Query, BackgroundTasks
+from typing import Optional
 from datetime import datetime
 from bson import ObjectId
 from app.models.user import User, UserUpdate, ProblemSolverProfile
-from app.utils.auth import get_current_user, require_role
+from app.models.page import Page
+from app.utils.auth import get_current_user, require_role, principal_cache
+from app.utils.user_cache import user_cache, user_changed
+from app.utils.party_details import propagate_user_details
+from app.utils.pagination import PageParams, find_page, split_page
+from app.utils.search import user_search_query
+from app.utils.streaming import StreamParams, stream_documents
 from app.database import get_database
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
-@router.get("/", response_model=List[User])
-async def get_all_users(current_user: User = Depends(require_role(["admin"]))):
-    """Admin only: Get all users"""
+@router.get("/", response_model=Page[User])
+async def get_all_users(
+    page: PageParams = Depends(),
+    stream: StreamParams = Depends(),
+    current_user: User = Depends(require_role(["admin"]))
+):
+    """Admin only: Get all users (streams every user with Accept: application/x-ndjson or ?stream=1)"""
     db = get_database()
+    if stream.format:
+        return stream_documents(db.users, {}, User, stream, page.cursor, projection={"hashed_password": 0})
+
     users = []
-    async for user in db.users.find():
+    docs, next_cursor = split_page(await find_page(db.users, {}, page).to_list(length=None), page)
+    for user in docs:
         user["id"] = str(user.pop("_id"))
         # Remove hashed_password before creating User object
         user.pop("hashed_password", None)
@@ -24,13 +38,20 @@ async def get_all_users(current_user: User = Depends(require_role(["admin"]))):
             # Log the error but continue processing other users
             print(f"Error processing user {user.get('email', 'unknown')}: {e}")
             continue
-    return users
+    return Page(items=users, next_cursor=next_cursor)
+
+
+@router.get("/cache-stats")
+async def get_cache_stats(current_user: User = Depends(require_role(["admin"]))):
+    """Admin only: Hit/miss counters of the in-process caches"""
+    return {"principals": principal_cache.stats(), "users": user_cache.stats()}
 
 
 @router.patch("/{user_id}/role", response_model=User)
 async def assign_role(
     user_id: str,
     role_update: UserUpdate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(require_role(["admin"]))
 ):
     """Admin only: Assign role to a user"""
@@ -50,17 +71,26 @@ async def assign_role(
     if not result:
         raise HTTPException(status_code=404, detail="User not found")
 
+    await user_changed(db, result)
+    # Refresh the copies of the user's details on projects and requests
+    background_tasks.add_task(propagate_user_details, db, dict(result))
+
     result["id"] = str(result.pop("_id"))
     result.pop("hashed_password", None)
     return User(**result)
 
 
-@router.get("/problem-solvers", response_model=List[User])
-async def get_problem_solvers(current_user: User = Depends(get_current_user)):
+@router.get("/problem-solvers", response_model=Page[User])
+async def get_problem_solvers(
+    page: PageParams = Depends(),
+    current_user: User = Depends(get_current_user)
+):
     """Get all problem solvers"""
     db = get_database()
     solvers = []
-    async for user in db.users.find({"role": "problem_solver"}):
+    query = {"role": "problem_solver"}
+    docs, next_cursor = split_page(await find_page(db.users, query, page).to_list(length=None), page)
+    for user in docs:
         user["id"] = str(user.pop("_id"))
         user.pop("hashed_password", None)
         try:
@@ -69,12 +99,13 @@ async def get_problem_solvers(current_user: User = Depends(get_current_user)):
             # Log the error but continue processing other users
             print(f"Error processing user {user.get('email', 'unknown')}: {e}")
             continue
-    return solvers
+    return Page(items=solvers, next_cursor=next_cursor)
 
 
 @router.put("/profile", response_model=User)
 async def update_profile(
     profile: ProblemSolverProfile,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(require_role(["problem_solver"]))
 ):
     """Problem solver: Update profile"""
@@ -89,37 +120,29 @@ async def update_profile(
     if not result:
         raise HTTPException(status_code=404, detail="User not found")
 
+    await user_changed(db, result)
+    # Refresh the copies of the user's details on projects and requests
+    background_tasks.add_task(propagate_user_details, db, dict(result))
+
     result["id"] = str(result.pop("_id"))
     result.pop("hashed_password", None)
     return User(**result)
 
 
-@router.get("/search/", response_model=List[User])
+@router.get("/search/", response_model=Page[User])
 async def search_users(
     q: Optional[str] = Query(None, description="Search query for name or email"),
     role: Optional[str] = Query(None, description="Filter by role"),
+    page: PageParams = Depends(),
     current_user: User = Depends(get_current_user)
 ):
     """Search users by name or email"""
     db = get_database()
     users = []
 
-    # Build search query
-    query = {}
-
-    # Add role filter if provided
-    if role:
-        query["role"] = role
-
-    # Add text search if query provided
-    if q and q.strip():
-        query["$or"] = [
-            {"full_name": {"$regex": q, "$options": "i"}},
-            {"email": {"$regex": q, "$options": "i"}}
-        ]
-
-    cursor = db.users.find(query)
-    async for user in cursor:
+    query = user_search_query(q, role)
+    docs, next_cursor = split_page(await find_page(db.users, query, page).to_list(length=None), page)
+    for user in docs:
         user["id"] = str(user.pop("_id"))
         user.pop("hashed_password", None)
         try:
@@ -128,7 +151,7 @@ async def search_users(
             print(f"Error processing user {user.get('email', 'unknown')}: {e}")
             continue
 
-    return users
+    return Page(items=users, next_cursor=next_cursor)
 
 
 
@@ -0,0 +1,143 @@
+"""
+Submission archive indexing.
+
+After a submission is stored, scan_archive runs in a process pool (CRC checks
+decompress every entry, which is CPU-bound) to validate the ZIP, reject zip bombs
+and record its central-directory manifest on the task. Entries can then be read
+one at a time without downloading the archive.
+"""
+import asyncio
+import multiprocessing
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Optional
+from bson import ObjectId
+from app.config import settings
+
+READ_CHUNK_SIZE = 64 * 1024
+# Small, highly repetitive files compress extremely well; only large entries are ratio-checked
+RATIO_CHECK_MIN_SIZE = 1024 * 1024
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _rejected(reason: str) -> dict:
+    return {"status": "rejected", "reason": reason, "entries": []}
+
+
+def scan_archive(path: str, max_entries: int, max_total_size: int, max_ratio: float) -> dict:
+    """Validate a ZIP archive and return its manifest. Runs in a worker process."""
+    try:
+        with zipfile.ZipFile(path) as archive:
+            infos = [info for info in archive.infolist() if not info.is_dir()]
+            if len(infos) > max_entries:
+                return _rejected(f"Archive has more than {max_entries} entries")
+
+            entries = []
+            declared_total = 0
+            for info in infos:
+                name = info.filename
+                if name.startswith("/") or ".." in name.split("/"):
+                    return _rejected(f"Unsafe entry path: {name}")
+                ratio = info.file_size / info.compress_size if info.compress_size else 0.0
+                if info.file_size >= RATIO_CHECK_MIN_SIZE and ratio > max_ratio:
+                    return _rejected(f"Entry {name} exceeds the {max_ratio:g}:1 compression ratio limit")
+                declared_total += info.file_size
+                if declared_total > max_total_size:
+                    return _rejected("Archive expands beyond the uncompressed size limit")
+                entries.append({
+                    "path": name,
+                    "size": info.file_size,
+                    "compressed_size": info.compress_size,
+                    "compression_ratio": round(ratio, 2),
+                    "crc": f"{info.CRC:08x}",
+                })
+
+            # Decompress every entry: ZipExtFile verifies the CRC at EOF. Count the real
+            # output so headers that under-declare sizes cannot slip a bomb through.
+            actual_total = 0
+            for info in infos:
+                with archive.open(info) as entry:
+                    while chunk := entry.read(READ_CHUNK_SIZE):
+                        actual_total += len(chunk)
+                        if actual_total > max_total_size:
+                            return _rejected("Archive expands beyond the uncompressed size limit")
+    except zipfile.BadZipFile as e:
+        return _rejected(f"Invalid ZIP archive: {e}")
+    except (zipfile.LargeZipFile, NotImplementedError, RuntimeError) as e:
+        # Unsupported compression methods and encrypted entries
+        return _rejected(f"Unsupported ZIP archive: {e}")
+    except (zlib.error, EOFError, OSError) as e:
+        # Corrupt or truncated compressed data
+        return _rejected(f"Corrupt ZIP archive: {e}")
+
+    return {
+        "status": "ok",
+        "reason": None,
+        "entries": entries,
+        "entry_count": len(entries),
+        "total_size": declared_total,
+        "total_compressed_size": sum(entry["compressed_size"] for entry in entries),
+    }
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: the API process runs driver threads, which fork does not copy safely
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.archive_scan_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def index_submission(db, task_id: str, path: str, sha256: str):
+    """Scan a stored submission and record the manifest on its task (background task)"""
+    # Blobs are content-addressed, so a manifest computed for identical bytes is reused
+    blob = await db.blobs.find_one({"_id": sha256}, {"manifest": 1})
+    manifest = blob.get("manifest") if blob else None
+    if manifest is None:
+        try:
+            manifest = await asyncio.get_running_loop().run_in_executor(
+                get_pool(),
+                scan_archive,
+                path,
+                settings.archive_max_entries,
+                settings.archive_max_uncompressed_mb * 1024 * 1024,
+                settings.archive_max_ratio,
+            )
+        except Exception as e:
+            # A crashed worker or an unexpected error; the task must not wait forever.
+            # Not cached on the blob, so the same bytes are scanned again next time.
+            manifest = {"status": "error", "reason": f"Indexing failed: {e}", "entries": []}
+        else:
+            await db.blobs.update_one({"_id": sha256}, {"$set": {"manifest": manifest}})
+
+    # Only if the task still holds this submission; a newer one gets its own scan
+    query = {"_id": ObjectId(task_id), "submission_sha256": sha256}
+    update = {"submission_manifest": manifest, "updated_at": datetime.utcnow()}
+    if manifest["status"] == "rejected":
+        query["status"] = "submitted"
+        update["status"] = "rejected"
+        update["review_comment"] = f"Submission rejected automatically: {manifest['reason']}"
+    await db.tasks.update_one(query, {"$set": update})
+
+
+def open_entry(path: str, entry_path: str):
+    """Open one archive entry for streaming; zipfile seeks straight to it via the central directory"""
+    archive = zipfile.ZipFile(path)
+    try:
+        return archive, archive.open(entry_path)
+    except BaseException:
+        archive.close()
+        raise
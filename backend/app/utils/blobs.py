@@ -0,0 +1,126 @@
+"""
+Content-addressed storage for task submissions.
+
+Files live at {upload_dir}/blobs/ab/cd/<sha256> and are shared by every task that
+submitted identical bytes. The blobs collection keeps one document per file with a
+reference count; blobs whose count has stayed at zero for the grace period are
+removed by the background collector.
+"""
+import asyncio
+import os
+import secrets
+from datetime import datetime, timedelta
+from fastapi import UploadFile
+from pymongo import ReturnDocument
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.utils.storage import StoredFile, discard_file, stream_upload
+
+
+def blob_root() -> str:
+    return os.path.join(settings.upload_dir, "blobs")
+
+
+def blob_path(sha256: str) -> str:
+    return os.path.join(blob_root(), sha256[:2], sha256[2:4], sha256)
+
+
+def is_blob_path(path: str) -> bool:
+    return os.path.abspath(path).startswith(os.path.abspath(blob_root()) + os.sep)
+
+
+def _place_blob(tmp_path: str, path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path):
+        # Identical content is already stored
+        discard_file(tmp_path)
+    else:
+        os.replace(tmp_path, path)
+
+
+async def store_blob(db, upload: UploadFile) -> StoredFile:
+    """Stream an upload into the blob store and take a reference on its blob"""
+    stored = await stream_upload(upload, os.path.join(settings.upload_dir, "tmp"))
+    path = blob_path(stored.sha256)
+    now = datetime.utcnow()
+    await db.blobs.find_one_and_update(
+        {"_id": stored.sha256},
+        {
+            "$inc": {"refcount": 1},
+            "$set": {"updated_at": now},
+            "$unset": {"released_at": ""},
+            "$setOnInsert": {"path": path, "size": stored.size, "created_at": now},
+        },
+        upsert=True,
+    )
+    # Placed after taking the reference so a concurrent collection of the same
+    # content cannot remove it (see collect_garbage)
+    try:
+        await run_in_threadpool(_place_blob, stored.path, path)
+    except BaseException:
+        await release_blob(db, stored.sha256)
+        await run_in_threadpool(discard_file, stored.path)
+        raise
+    return StoredFile(path=path, sha256=stored.sha256, size=stored.size)
+
+
+async def release_blob(db, sha256: str):
+    """Drop one reference; the blob becomes collectable once unreferenced for the grace period"""
+    now = datetime.utcnow()
+    result = await db.blobs.find_one_and_update(
+        {"_id": sha256, "refcount": {"$gt": 0}},
+        {"$inc": {"refcount": -1}, "$set": {"updated_at": now}},
+        return_document=ReturnDocument.AFTER,
+    )
+    if result and result["refcount"] <= 0:
+        await db.blobs.update_one({"_id": sha256, "refcount": {"$lte": 0}}, {"$set": {"released_at": now}})
+
+
+def _remove_blob_file(path: str) -> str:
+    tombstone = f"{path}.gc-{secrets.token_hex(4)}"
+    try:
+        os.rename(path, tombstone)
+    except FileNotFoundError:
+        return ""
+    return tombstone
+
+
+def _finish_removal(path: str, tombstone: str, resurrected: bool):
+    if resurrected and not os.path.exists(path):
+        # Re-uploaded while being collected; identical bytes, so restore them
+        os.replace(tombstone, path)
+    else:
+        discard_file(tombstone)
+
+
+def garbage_filter(cutoff: datetime) -> dict:
+    """Blobs unreferenced since before `cutoff`"""
+    return {"refcount": {"$lte": 0}, "released_at": {"$lt": cutoff}}
+
+
+async def collect_garbage(db) -> int:
+    """Delete blobs that have been unreferenced for longer than the grace period"""
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.blob_gc_grace_seconds)
+    removed = 0
+    async for blob in db.blobs.find(garbage_filter(cutoff)):
+        deleted = await db.blobs.delete_one({"_id": blob["_id"], "refcount": {"$lte": 0}})
+        if not deleted.deleted_count:
+            continue
+        tombstone = await run_in_threadpool(_remove_blob_file, blob["path"])
+        if tombstone:
+            resurrected = await db.blobs.find_one({"_id": blob["_id"]}, {"_id": 1}) is not None
+            await run_in_threadpool(_finish_removal, blob["path"], tombstone, resurrected)
+        removed += 1
+    return removed
+
+
+async def run_garbage_collector(db):
+    """Background loop started by the lifespan hook"""
+    while True:
+        try:
+            removed = await collect_garbage(db)
+            if removed:
+                print(f"Collected {removed} unreferenced submission blob(s)")
+        except Exception as e:
+            print(f"Blob garbage collection failed: {e}")
+        await asyncio.sleep(settings.blob_gc_interval_seconds)
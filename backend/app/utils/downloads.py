@@ -0,0 +1,254 @@
+import hashlib
+import hmac
+import os
+import secrets
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+from urllib.parse import quote, urlencode
+from fastapi import Request
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import RedirectResponse, Response
+from app.config import settings
+
+CHUNK_SIZE = 64 * 1024
+# Larger range sets are served as a full response rather than as many tiny parts
+MAX_RANGES = 16
+
+
+def content_disposition(filename: str, disposition: str = "attachment") -> str:
+    quoted = quote(filename)
+    if quoted == filename:
+        return f'{disposition}; filename="{filename}"'
+    return f"{disposition}; filename*=utf-8''{quoted}"
+
+
+def parse_range_header(value: str, size: int) -> Optional[list[tuple[int, int]]]:
+    """Parse a bytes Range header into merged, inclusive (start, end) pairs.
+
+    Returns None when the header is malformed or uses another unit (it must then be
+    ignored) and an empty list when no range is satisfiable.
+    """
+    unit, _, spec = value.partition("=")
+    if unit.strip().lower() != "bytes":
+        return None
+    ranges = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, sep, last = part.partition("-")
+        if not sep:
+            return None
+        try:
+            if first == "":
+                # Suffix range: the last N bytes
+                length = int(last)
+                if length <= 0:
+                    continue
+                start, end = max(0, size - length), size - 1
+            else:
+                start = int(first)
+                end = int(last) if last else size - 1
+                if last and end < start:
+                    return None
+                if start >= size:
+                    continue
+                end = min(end, size - 1)
+        except ValueError:
+            return None
+        ranges.append((start, end))
+
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison used by If-None-Match"""
+    if header.strip() == "*":
+        return True
+    bare = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == bare for tag in header.split(","))
+
+
+def _if_range_matches(header: str, etag: str, mtime: int) -> bool:
+    header = header.strip()
+    if header.startswith('"') or header.startswith("W/"):
+        # If-Range requires a strong match
+        return not etag.startswith("W/") and header == etag
+    try:
+        return int(parsedate_to_datetime(header).timestamp()) == mtime
+    except (TypeError, ValueError):
+        return False
+
+
+def _not_modified(request: Request, etag: str, mtime: int) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return mtime <= int(parsedate_to_datetime(if_modified_since).timestamp())
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+class FileRangeResponse(Response):
+    """Streams whole files or byte ranges of a file, using the ASGI zero-copy
+    extension when the server offers it and threadpool reads otherwise."""
+
+    def __init__(self, path: str, parts: list[tuple[bytes, int, int]], trailer: bytes,
+                 status_code: int, headers: dict):
+        super().__init__(status_code=status_code, headers=headers)
+        self.path = path
+        self.parts = parts
+        self.trailer = trailer
+
+    async def __call__(self, scope, receive, send):
+        zerocopy = "http.response.zerocopy" in scope.get("extensions", {})
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        file = await run_in_threadpool(open, self.path, "rb")
+        try:
+            for prefix, start, end in self.parts:
+                if prefix:
+                    await send({"type": "http.response.body", "body": prefix, "more_body": True})
+                count = end - start + 1
+                if zerocopy:
+                    await send({
+                        "type": "http.response.zerocopy",
+                        "file": file,
+                        "offset": start,
+                        "count": count,
+                        "more_body": True,
+                    })
+                    continue
+                await run_in_threadpool(file.seek, start)
+                while count > 0:
+                    chunk = await run_in_threadpool(file.read, min(CHUNK_SIZE, count))
+                    if not chunk:
+                        break
+                    count -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": self.trailer, "more_body": False})
+        finally:
+            await run_in_threadpool(file.close)
+
+
+async def file_download_response(request: Request, path: str, filename: str, media_type: str,
+                                 sha256: Optional[str] = None) -> Response:
+    """Serve a stored file with validators, conditional GET and Range support"""
+    stat_result = await run_in_threadpool(os.stat, path)
+    size = stat_result.st_size
+    mtime = int(stat_result.st_mtime)
+    # The content hash is a strong validator; without one fall back to a weak mtime/size tag
+    etag = f'"{sha256}"' if sha256 else f'W/"{mtime:x}-{size:x}"'
+    headers = {
+        "accept-ranges": "bytes",
+        "etag": etag,
+        "last-modified": formatdate(mtime, usegmt=True),
+        "content-disposition": content_disposition(filename),
+    }
+
+    if _not_modified(request, etag, mtime):
+        return Response(status_code=304, headers={k: headers[k] for k in ("etag", "last-modified")})
+
+    ranges = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or _if_range_matches(if_range, etag, mtime)):
+        ranges = parse_range_header(range_header, size)
+        if ranges == []:
+            return Response(status_code=416, headers={"content-range": f"bytes */{size}", **headers})
+        if ranges is not None and len(ranges) > MAX_RANGES:
+            ranges = None
+
+    if not ranges:
+        headers["content-type"] = media_type
+        headers["content-length"] = str(size)
+        return FileRangeResponse(path, [(b"", 0, size - 1)] if size else [], b"", 200, headers)
+
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        headers["content-type"] = media_type
+        headers["content-range"] = f"bytes {start}-{end}/{size}"
+        headers["content-length"] = str(end - start + 1)
+        return FileRangeResponse(path, [(b"", start, end)], b"", 206, headers)
+
+    boundary = secrets.token_hex(16)
+    parts = []
+    length = 0
+    for index, (start, end) in enumerate(ranges):
+        # Each part after the first is separated from the previous part's data by CRLF
+        prefix = (b"\r\n" if index else b"") + (
+            f"--{boundary}\r\n"
+            f"Content-Type: {media_type}\r\n"
+            f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+        ).encode("latin-1")
+        parts.append((prefix, start, end))
+        length += len(prefix) + end - start + 1
+    trailer = f"\r\n--{boundary}--\r\n".encode("latin-1")
+    headers["content-type"] = f"multipart/byteranges; boundary={boundary}"
+    headers["content-length"] = str(length + len(trailer))
+    return FileRangeResponse(path, parts, trailer, 206, headers)
+
+
+def upload_relative_path(path: str) -> str:
+    """Path of a stored file relative to the upload directory, with forward slashes"""
+    return os.path.relpath(path, settings.upload_dir).replace(os.sep, "/")
+
+
+def download_signature(relative_path: str, filename: str, expires: int) -> str:
+    # The download name is signed too, so a link cannot be reused under another name
+    message = f"{relative_path}\n{filename}\n{expires}".encode()
+    return hmac.new(settings.secret_key.encode(), message, hashlib.sha256).hexdigest()
+
+
+def signed_download_url(path: str, filename: str) -> str:
+    """Blobs are stored under their hash, so the original name travels in the URL"""
+    relative_path = upload_relative_path(path)
+    expires = int(time.time()) + settings.download_url_ttl_seconds
+    signature = download_signature(relative_path, filename, expires)
+    base = settings.download_base_url.rstrip("/")
+    query = urlencode({"filename": filename, "expires": expires, "signature": signature})
+    return f"{base}/{quote(relative_path)}?{query}"
+
+
+def verify_download_signature(relative_path: str, filename: str, expires: int, signature: str) -> bool:
+    if expires < time.time():
+        return False
+    return hmac.compare_digest(download_signature(relative_path, filename, expires), signature)
+
+
+def offloaded_download_response(path: str, filename: str, media_type: str) -> Optional[Response]:
+    """Hand the transfer to the file server or front proxy per DOWNLOAD_MODE.
+
+    Returns None in direct mode, where the API streams the file itself.
+    """
+    mode = settings.download_mode
+    if mode == "signed_url":
+        return RedirectResponse(signed_download_url(path, filename), status_code=307)
+
+    headers = {"content-type": media_type, "content-disposition": content_disposition(filename)}
+    if mode == "x_accel_redirect":
+        prefix = settings.download_internal_prefix.rstrip("/")
+        headers["x-accel-redirect"] = f"{prefix}/{quote(upload_relative_path(path))}"
+        return _proxy_handoff_response(headers)
+    if mode == "x_sendfile":
+        headers["x-sendfile"] = os.path.abspath(path)
+        return _proxy_handoff_response(headers)
+    return None
+
+
+def _proxy_handoff_response(headers: dict) -> Response:
+    """An empty 200 whose body the proxy supplies. The headers are set explicitly because
+    Starlette would add content-length: 0, which proxies that keep it pass to clients."""
+    response = Response(status_code=200)
+    response.raw_headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()]
+    return response
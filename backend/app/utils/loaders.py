@@ -0,0 +1,56 @@
+"""
+Request-scoped batch loading of user details.
+
+Handlers that decorate a list with user names collect the ids first and resolve them
+with one users.find({"_id": {"$in": ...}}) instead of a find_one per row. Declared with
+Depends(), a UserLoader lives for one request and is shared by every dependency of it,
+so ids already loaded are not fetched again. Summaries cached process-wide by
+user_cache are served without a query at all.
+"""
+from typing import Iterable, Optional
+from bson import ObjectId
+from app.database import get_database
+from app.utils.user_cache import SUMMARY_FIELDS, user_cache
+
+USER_FIELDS = {field: 1 for field in SUMMARY_FIELDS}
+
+
+class UserLoader:
+    def __init__(self):
+        self._users: dict[str, Optional[dict]] = {}
+
+    async def load_many(self, user_ids: Iterable[Optional[str]]) -> dict[str, dict]:
+        """Return {id: user} for the given ids, querying only the ones not loaded yet"""
+        wanted = {user_id for user_id in user_ids if user_id}
+        missing = []
+        for user_id in wanted:
+            if user_id in self._users:
+                continue
+            cached = user_cache.get(user_id)
+            if cached is not None:
+                self._users[user_id] = cached
+            else:
+                missing.append(user_id)
+        if missing:
+            oids = [ObjectId(user_id) for user_id in missing if ObjectId.is_valid(user_id)]
+            if oids:
+                async for user in get_database().users.find({"_id": {"$in": oids}}, USER_FIELDS):
+                    user_id = str(user["_id"])
+                    self._users[user_id] = user
+                    user_cache.put(user_id, user)
+            # Remember misses too so unknown ids are not looked up again
+            for user_id in missing:
+                self._users.setdefault(user_id, None)
+        return {user_id: self._users[user_id] for user_id in wanted if self._users[user_id]}
+
+    async def load(self, user_id: Optional[str]) -> Optional[dict]:
+        return (await self.load_many([user_id])).get(user_id)
+
+    async def populate(self, docs: list[dict], id_field: str, prefix: str):
+        """Set <prefix>_email / <prefix>_name on each doc from the user in doc[id_field]"""
+        users = await self.load_many(doc.get(id_field) for doc in docs)
+        for doc in docs:
+            user = users.get(doc.get(id_field))
+            if user:
+                doc[f"{prefix}_email"] = user.get("email")
+                doc[f"{prefix}_name"] = user.get("full_name")
@@ -0,0 +1,140 @@
+"""
+Prometheus metrics: per-route HTTP latency and the Mongo commands each route issues.
+
+MetricsMiddleware records latency, status codes and in-flight requests, and puts a
+RequestStats holder in a contextvar for the duration of the request. Motor runs
+pymongo calls on its executor with a copy of the caller's context, so the
+CommandListener registered on the client sees the same holder and attributes each
+command to the route being served. A route issuing many commands per request (N+1)
+stands out in http_request_mongo_commands.
+
+Routes are labelled by their path template (/projects/{project_id}), never by the raw
+path. Under several worker processes set PROMETHEUS_MULTIPROC_DIR so /metrics
+aggregates all of them.
+"""
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from pymongo import monitoring
+from starlette.responses import Response
+
+UNMATCHED_ROUTE = "<unmatched>"
+NO_ROUTE = "<background>"
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route and status code", ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ["method", "route"]
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served", ["method"], multiprocess_mode="livesum"
+)
+HTTP_MONGO_COMMANDS = Histogram(
+    "http_request_mongo_commands", "Mongo commands issued per HTTP request", ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250, 1000),
+)
+MONGO_COMMANDS = Counter(
+    "mongo_commands_total", "Mongo commands by route, command and outcome", ["route", "command", "outcome"]
+)
+MONGO_LATENCY = Histogram(
+    "mongo_command_duration_seconds", "Mongo command latency by route and command", ["route", "command"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+
+class RequestStats:
+    """Per-request holder shared with the command listener through the contextvar"""
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.mongo_commands = 0
+
+    @property
+    def route(self) -> str:
+        # The router stores the matched route in the scope once it has routed the request
+        route = self.scope.get("route")
+        return getattr(route, "path", UNMATCHED_ROUTE)
+
+    @property
+    def handler(self) -> Optional[str]:
+        endpoint = getattr(self.scope.get("route"), "endpoint", None)
+        return f"{endpoint.__module__}.{endpoint.__qualname__}" if endpoint else None
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    def started(self, event):
+        stats = current_request.get()
+        if stats is not None:
+            stats.mongo_commands += 1
+
+    def _record(self, event, outcome: str):
+        stats = current_request.get()
+        route = stats.route if stats is not None else NO_ROUTE
+        MONGO_COMMANDS.labels(route, event.command_name, outcome).inc()
+        MONGO_LATENCY.labels(route, event.command_name).observe(event.duration_micros / 1e6)
+
+    def succeeded(self, event):
+        self._record(event, "ok")
+
+    def failed(self, event):
+        self._record(event, "error")
+
+
+mongo_command_listener = MongoCommandListener()
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        stats = RequestStats(scope)
+        token = current_request.set(stats)
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.labels(method).inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_FLIGHT.labels(method).dec()
+            route = stats.route
+            HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+            HTTP_LATENCY.labels(method, route).observe(elapsed)
+            HTTP_MONGO_COMMANDS.labels(method, route).observe(stats.mongo_commands)
+            current_request.reset(token)
+
+
+def metrics_response() -> Response:
+    """Everything above in the Prometheus text format"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,103 @@
+"""
+Ownership resolution for the milestone -> plan -> request -> project chain.
+
+One aggregation starting from any link joins the rest of the chain with $lookup, so
+handlers learn the buyer and solver behind a milestone, plan or request in a single
+round-trip. The resolver is a per-request dependency that memoizes what it fetched.
+"""
+from typing import NamedTuple, Optional
+from bson import ObjectId
+from fastapi import HTTPException
+from app.database import get_database
+
+# (field holding the parent id, parent collection, name of the joined document)
+_HOPS = [
+    ("plan_id", "plans", "plan"),
+    ("request_id", "requests", "request"),
+    ("project_id", "projects", "project"),
+]
+_ROOTS = {"milestone": ("milestones", 0), "plan": ("plans", 1), "request": ("requests", 2)}
+_NOT_FOUND = {
+    "milestone": "Milestone not found",
+    "plan": "Plan not found",
+    "request": "Request not found",
+    "project": "Project not found",
+}
+
+
+class OwnershipChain(NamedTuple):
+    milestone: Optional[dict]
+    plan: Optional[dict]
+    request: dict
+    project: dict
+
+    @property
+    def buyer_id(self) -> str:
+        return self.project["buyer_id"]
+
+    @property
+    def solver_id(self) -> str:
+        return self.request["solver_id"]
+
+
+def _chain_pipeline(root: str, root_id: ObjectId) -> list[dict]:
+    _, first_hop = _ROOTS[root]
+    pipeline = [{"$match": {"_id": root_id}}]
+    parent = None
+    for field, collection, name in _HOPS[first_hop:]:
+        source = f"${field}" if parent is None else f"${parent}.{field}"
+        pipeline += [
+            {"$addFields": {"_link": {"$convert": {"input": source, "to": "objectId", "onError": None, "onNull": None}}}},
+            {"$lookup": {"from": collection, "localField": "_link", "foreignField": "_id", "as": name}},
+            {"$addFields": {name: {"$arrayElemAt": [f"${name}", 0]}}},
+        ]
+        parent = name
+    pipeline.append({"$project": {"_link": 0}})
+    return pipeline
+
+
+class OwnershipResolver:
+    """Request-scoped resolver: declare it with Depends() and every use within the
+    request shares the same instance and its memo."""
+
+    def __init__(self):
+        self._memo: dict[tuple[str, str], OwnershipChain] = {}
+
+    async def for_milestone(self, milestone_id: str) -> OwnershipChain:
+        return await self._resolve("milestone", milestone_id)
+
+    async def for_plan(self, plan_id: str) -> OwnershipChain:
+        return await self._resolve("plan", plan_id)
+
+    async def for_request(self, request_id: str) -> OwnershipChain:
+        return await self._resolve("request", request_id)
+
+    async def _resolve(self, root: str, root_id: str) -> OwnershipChain:
+        key = (root, root_id)
+        if key in self._memo:
+            return self._memo[key]
+        if not ObjectId.is_valid(root_id):
+            raise HTTPException(status_code=400, detail=f"Invalid {root} ID")
+
+        collection, _ = _ROOTS[root]
+        db = get_database()
+        docs = await db[collection].aggregate(_chain_pipeline(root, ObjectId(root_id))).to_list(length=1)
+        if not docs:
+            raise HTTPException(status_code=404, detail=_NOT_FOUND[root])
+
+        doc = docs[0]
+        links = {"milestone": None, "plan": None, root: doc}
+        for _, _, name in _HOPS[_ROOTS[root][1]:]:
+            linked = doc.pop(name, None)
+            # A dangling id anywhere along the chain is reported as the missing link
+            if linked is None:
+                raise HTTPException(status_code=404, detail=_NOT_FOUND[name])
+            links[name] = linked
+
+        chain = OwnershipChain(**links)
+        self._memo[key] = chain
+        # The upper links resolve the shorter chains too
+        if chain.plan is not None:
+            self._memo[("plan", str(chain.plan["_id"]))] = chain._replace(milestone=None)
+        self._memo[("request", str(chain.request["_id"]))] = chain._replace(milestone=None, plan=None)
+        return chain
@@ -0,0 +1,107 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+from bson import ObjectId
+from fastapi import HTTPException, Query
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Every paginated listing is ordered by this key; the indexes created at startup
+# end with the same fields so each page is a bounded index range scan.
+PAGE_SORT = [("created_at", 1), ("_id", 1)]
+
+
+class PageParams:
+    """Query parameters shared by every paginated list endpoint"""
+
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+        cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+
+
+def _encode(payload: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> dict:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+
+def encode_cursor(doc: dict) -> str:
+    return _encode({"c": doc["created_at"].isoformat(), "i": str(doc["_id"])})
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, ObjectId]:
+    try:
+        payload = _decode(cursor)
+        return datetime.fromisoformat(payload["c"]), ObjectId(payload["i"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_score_cursor(doc: dict) -> str:
+    return _encode({"s": doc["_score"], "i": str(doc["_id"])})
+
+
+def decode_score_cursor(cursor: str) -> tuple[float, ObjectId]:
+    try:
+        payload = _decode(cursor)
+        return float(payload["s"]), ObjectId(payload["i"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_query(query: dict, cursor: Optional[str]) -> dict:
+    """Restrict a query to the documents that sort after the cursor"""
+    if not cursor:
+        return query
+    created_at, last_id = decode_cursor(cursor)
+    # The $gte bound keeps the created_at range tight on the index; the $or breaks ties on _id
+    after_cursor = {
+        "created_at": {"$gte": created_at},
+        "$or": [
+            {"created_at": {"$gt": created_at}},
+            {"_id": {"$gt": last_id}}
+        ]
+    }
+    return {"$and": [query, after_cursor]} if query else after_cursor
+
+
+def find_page(collection, query: dict, page: PageParams, projection: Optional[dict] = None):
+    """Cursor over one page of `query`, fetching one extra document to detect a next page"""
+    cursor = collection.find(keyset_query(query, page.cursor), projection)
+    return cursor.sort(PAGE_SORT).limit(page.limit + 1)
+
+
+def text_page_stages(query: dict, search: str, page: PageParams) -> list[dict]:
+    """One page of a $text search ordered by relevance, keyed on (score desc, _id)"""
+    stages = [
+        {"$match": {"$and": [query, {"$text": {"$search": search}}]} if query else {"$text": {"$search": search}}},
+        {"$addFields": {"_score": {"$meta": "textScore"}}},
+    ]
+    if page.cursor:
+        score, last_id = decode_score_cursor(page.cursor)
+        stages.append({"$match": {"$or": [
+            {"_score": {"$lt": score}},
+            {"_score": score, "_id": {"$gt": last_id}}
+        ]}})
+    stages += [
+        {"$sort": {"_score": -1, "_id": 1}},
+        {"$limit": page.limit + 1},
+    ]
+    return stages
+
+
+def split_page(docs: list[dict], page: PageParams, encode=encode_cursor) -> tuple[list[dict], Optional[str]]:
+    """Trim the look-ahead document and return the cursor for the next page"""
+    if len(docs) <= page.limit:
+        return docs, None
+    docs = docs[:page.limit]
+    return docs, encode(docs[-1])
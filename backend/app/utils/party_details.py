@@ -0,0 +1,114 @@
+"""
+Buyer/solver details denormalized onto projects and requests.
+
+The writes that set a party (create_project, create_request, request acceptance, plan
+approval) copy its email and full_name next to the id, so listings are a plain find
+with no join. When a user changes, propagate_user_details fans the new values out in
+batches; find_drift / repair_drift back check_party_details.py. Documents written
+before denormalization are filled in from the UserLoader at read time.
+"""
+from typing import Optional
+from pymongo import UpdateOne
+
+FANOUT_BATCH_SIZE = 500
+
+# (collection, id field, prefix of the denormalized <prefix>_email / <prefix>_name)
+PARTY_LINKS = [
+    ("projects", "buyer_id", "buyer"),
+    ("projects", "assigned_solver_id", "solver"),
+    ("requests", "buyer_id", "buyer"),
+    ("requests", "solver_id", "solver"),
+]
+
+
+def party_fields(prefix: str, user: Optional[dict]) -> dict:
+    """The denormalized fields for one party, from a user document or summary"""
+    user = user or {}
+    return {f"{prefix}_email": user.get("email"), f"{prefix}_name": user.get("full_name")}
+
+
+async def copy_party(doc: dict, id_field: str, prefix: str, loader) -> dict:
+    """One party's fields taken from a document that references it, e.g. a project's
+    buyer for a new request; legacy documents without the copy go through the loader"""
+    if f"{prefix}_email" in doc:
+        return {field: doc.get(field) for field in (f"{prefix}_email", f"{prefix}_name")}
+    return party_fields(prefix, await loader.load(doc.get(id_field)))
+
+
+async def fill_missing_details(collection: str, docs: list[dict], loader):
+    """Resolve party details for documents written before they were denormalized"""
+    for link_collection, id_field, prefix in PARTY_LINKS:
+        if link_collection != collection:
+            continue
+        legacy = [doc for doc in docs if doc.get(id_field) and f"{prefix}_email" not in doc]
+        if legacy:
+            await loader.populate(legacy, id_field, prefix)
+
+
+async def propagate_user_details(db, user: dict):
+    """Rewrite the denormalized copies of a user's details, FANOUT_BATCH_SIZE at a time"""
+    user_id = str(user["_id"])
+    try:
+        for collection, id_field, prefix in PARTY_LINKS:
+            fields = party_fields(prefix, user)
+            # Only copies that differ are touched, so an unchanged user costs one query each
+            stale = {id_field: user_id, "$or": [{field: {"$ne": value}} for field, value in fields.items()]}
+            while True:
+                ids = [doc["_id"] async for doc in db[collection].find(stale, {"_id": 1}).limit(FANOUT_BATCH_SIZE)]
+                if not ids:
+                    break
+                await db[collection].update_many({"_id": {"$in": ids}}, {"$set": fields})
+                if len(ids) < FANOUT_BATCH_SIZE:
+                    break
+    except Exception as e:
+        # Runs as a background task; check_party_details.py --repair catches what is missed
+        print(f"Could not propagate details of user {user_id}: {e}")
+
+
+def _drift_pipeline(id_field: str, prefix: str) -> list[dict]:
+    return [
+        {"$match": {id_field: {"$type": "string"}}},
+        {"$addFields": {"_party_oid": {"$convert": {"input": f"${id_field}", "to": "objectId", "onError": None, "onNull": None}}}},
+        {"$lookup": {"from": "users", "localField": "_party_oid", "foreignField": "_id", "as": "_party"}},
+        # Missing fields and missing users compare as null
+        {"$project": {
+            "stored_email": {"$ifNull": [f"${prefix}_email", None]},
+            "stored_name": {"$ifNull": [f"${prefix}_name", None]},
+            "email": {"$ifNull": [{"$arrayElemAt": ["$_party.email", 0]}, None]},
+            "full_name": {"$ifNull": [{"$arrayElemAt": ["$_party.full_name", 0]}, None]},
+        }},
+        {"$match": {"$expr": {"$or": [
+            {"$ne": ["$stored_email", "$email"]},
+            {"$ne": ["$stored_name", "$full_name"]},
+        ]}}},
+    ]
+
+
+async def find_drift(db) -> list[dict]:
+    """Every document whose denormalized party details disagree with users"""
+    drift = []
+    for collection, id_field, prefix in PARTY_LINKS:
+        async for doc in db[collection].aggregate(_drift_pipeline(id_field, prefix)):
+            drift.append({
+                "collection": collection,
+                "_id": doc["_id"],
+                "prefix": prefix,
+                "stored": {"email": doc.get("stored_email"), "full_name": doc.get("stored_name")},
+                "expected": {"email": doc.get("email"), "full_name": doc.get("full_name")},
+            })
+    return drift
+
+
+async def repair_drift(db, drift: list[dict]) -> int:
+    """Overwrite drifted copies with the values from users; returns the documents modified"""
+    modified = 0
+    for collection in {entry["collection"] for entry in drift}:
+        operations = [
+            UpdateOne({"_id": entry["_id"]}, {"$set": party_fields(entry["prefix"], entry["expected"])})
+            for entry in drift
+            if entry["collection"] == collection
+        ]
+        for start in range(0, len(operations), FANOUT_BATCH_SIZE):
+            result = await db[collection].bulk_write(operations[start:start + FANOUT_BATCH_SIZE], ordered=False)
+            modified += result.modified_count
+    return modified
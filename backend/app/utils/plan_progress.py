@@ -0,0 +1,122 @@
+"""
+Plan progress counters.
+
+Plans keep milestones_total / milestones_completed, adjusted by deltas as milestones
+change status; progress_percentage is derived from them inside the same update. Every
+writer applies deltas rather than absolute counts, so concurrent updates add up instead
+of overwriting each other. A plan written before the counters existed is counted from
+its milestones on first touch. rebuild_plan_counters recomputes every plan's counters
+from the milestones collection.
+"""
+from datetime import datetime
+from bson import ObjectId
+from pymongo import UpdateOne
+
+BATCH_SIZE = 1000
+
+# Pipeline stage deriving progress_percentage from the counters on the server
+DERIVE_PROGRESS = {"$set": {"progress_percentage": {"$cond": [
+    {"$gt": ["$milestones_total", 0]},
+    {"$multiply": [{"$divide": ["$milestones_completed", "$milestones_total"]}, 100]},
+    0.0
+]}}}
+
+
+def completed_delta(old_status: str, new_status: str) -> int:
+    return int(new_status == "completed") - int(old_status == "completed")
+
+
+async def adjust_plan_progress(db, plan_id: str, completed: int = 0, total: int = 0, session=None):
+    """Apply counter deltas to a plan and re-derive its progress in one atomic update"""
+    if not completed and not total:
+        return
+    result = await db.plans.update_one(
+        {"_id": ObjectId(plan_id), "milestones_total": {"$exists": True}},
+        [
+            {"$set": {
+                "milestones_total": {"$add": ["$milestones_total", total]},
+                "milestones_completed": {"$add": ["$milestones_completed", completed]},
+                "updated_at": datetime.utcnow(),
+            }},
+            DERIVE_PROGRESS,
+        ],
+        session=session,
+    )
+    if not result.matched_count and not await _backfill_counters(db, plan_id, session):
+        # Another request backfilled the plan in between; apply the deltas on top
+        await adjust_plan_progress(db, plan_id, completed, total, session)
+
+
+async def _backfill_counters(db, plan_id: str, session=None) -> bool:
+    """Count the milestones of a plan that has no counters yet. The milestone writes that
+    called for the deltas have already landed, so the count includes them. Returns False
+    when the plan already has counters (or does not exist)."""
+    if not await db.plans.find_one({"_id": ObjectId(plan_id)}, {"_id": 1}, session=session):
+        return True
+    pipeline = [
+        {"$match": {"plan_id": plan_id}},
+        {"$group": {
+            "_id": None,
+            "total": {"$sum": 1},
+            "completed": {"$sum": {"$cond": [{"$eq": ["$status", "completed"]}, 1, 0]}},
+        }},
+    ]
+    groups = await db.milestones.aggregate(pipeline, session=session).to_list(length=1)
+    total, completed = (groups[0]["total"], groups[0]["completed"]) if groups else (0, 0)
+    result = await db.plans.update_one(
+        {"_id": ObjectId(plan_id), "milestones_total": {"$exists": False}},
+        _set_counters(total, completed),
+        session=session,
+    )
+    return bool(result.matched_count)
+
+
+def _set_counters(total: int, completed: int) -> list[dict]:
+    return [
+        {"$set": {"milestones_total": total, "milestones_completed": completed}},
+        DERIVE_PROGRESS,
+    ]
+
+
+def _counter_update(plan_id, total: int, completed: int) -> UpdateOne:
+    return UpdateOne({"_id": plan_id}, _set_counters(total, completed))
+
+
+async def _flush(db, batch: list) -> int:
+    if not batch:
+        return 0
+    result = await db.plans.bulk_write(batch, ordered=False)
+    return result.modified_count
+
+
+async def rebuild_plan_counters(db) -> int:
+    """Recompute every plan's counters from the milestones collection; returns plans updated"""
+    pipeline = [
+        {"$group": {
+            "_id": "$plan_id",
+            "total": {"$sum": 1},
+            "completed": {"$sum": {"$cond": [{"$eq": ["$status", "completed"]}, 1, 0]}},
+        }},
+    ]
+    updated = 0
+    counted = set()
+    batch = []
+    async for group in db.milestones.aggregate(pipeline):
+        if not ObjectId.is_valid(group["_id"]):
+            continue
+        plan_id = ObjectId(group["_id"])
+        counted.add(plan_id)
+        batch.append(_counter_update(plan_id, group["total"], group["completed"]))
+        if len(batch) >= BATCH_SIZE:
+            updated += await _flush(db, batch)
+            batch = []
+
+    # Plans that have no milestones at all
+    async for plan in db.plans.find({}, {"_id": 1}):
+        if plan["_id"] not in counted:
+            batch.append(_counter_update(plan["_id"], 0, 0))
+        if len(batch) >= BATCH_SIZE:
+            updated += await _flush(db, batch)
+            batch = []
+    updated += await _flush(db, batch)
+    return updated
@@ -0,0 +1,50 @@
+"""
+JSON responses encoded with orjson, and a fast path for trusted documents.
+
+FastJSONResponse is the app's default response class: orjson encodes datetime
+natively and ObjectIds are turned into strings. Handlers that return large lists
+of documents read from our own collections can skip both the Model(**doc) validation
+and FastAPI's second validation against response_model: trusted_item projects a
+document onto a model's fields (filling defaults) and the result is encoded directly.
+"""
+from functools import lru_cache
+from typing import Any, Optional
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def _default(value: Any):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default)
+
+
+@lru_cache(maxsize=None)
+def _model_fields(model: type[BaseModel]) -> tuple[tuple[str, Any], ...]:
+    # Required fields have no default; a document missing one is emitted with null
+    return tuple(
+        (name, None if field.is_required() else field.get_default(call_default_factory=True))
+        for name, field in model.model_fields.items()
+    )
+
+
+def trusted_item(model: type[BaseModel], doc: dict) -> dict:
+    """`doc` restricted to the fields of `model`, without validation"""
+    return {name: doc.get(name, default) for name, default in _model_fields(model)}
+
+
+def trusted_page(model: type[BaseModel], docs: list[dict], next_cursor: Optional[str]) -> FastJSONResponse:
+    """A Page[model] response built from trusted documents (already carrying "id")"""
+    return FastJSONResponse({
+        "items": [trusted_item(model, doc) for doc in docs],
+        "next_cursor": next_cursor,
+    })
@@ -0,0 +1,53 @@
+"""
+Filters for the project and user listings and searches.
+
+The routers and the QUERY_SHAPES registry in app.indexes both build their queries
+here, so check_indexes.py explains exactly what the API runs.
+"""
+import re
+from typing import Optional
+
+
+def visible_projects(role: str, user_id: str) -> dict:
+    """Projects a user may list: all for admins, their own for buyers, and open or
+    assigned ones for problem solvers"""
+    if role == "admin":
+        return {}
+    if role == "buyer":
+        return {"buyer_id": user_id}
+    return {
+        "$or": [
+            {"status": "open"},
+            {"assigned_solver_id": user_id}
+        ]
+    }
+
+
+def project_substring_query(base_query: dict, q: str) -> dict:
+    """Case-insensitive substring match on title or description"""
+    # The input is escaped so it is never interpreted as a pattern
+    pattern = re.escape(q.strip())
+    return {
+        "$and": [
+            base_query,
+            {
+                "$or": [
+                    {"title": {"$regex": pattern, "$options": "i"}},
+                    {"description": {"$regex": pattern, "$options": "i"}}
+                ]
+            }
+        ]
+    }
+
+
+def user_search_query(q: Optional[str], role: Optional[str]) -> dict:
+    """Users with the given role whose name or email matches q"""
+    query = {}
+    if role:
+        query["role"] = role
+    if q and q.strip():
+        query["$or"] = [
+            {"full_name": {"$regex": q, "$options": "i"}},
+            {"email": {"$regex": q, "$options": "i"}}
+        ]
+    return query
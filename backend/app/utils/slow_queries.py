@@ -0,0 +1,224 @@
+"""
+Slow-query log: Mongo commands slower than SLOW_QUERY_THRESHOLD_MS, with their plans.
+
+SlowQueryListener is registered on the client next to the metrics listener. When a
+command exceeds the threshold it records the command's shape (every literal value
+replaced by "?"), its duration and the route and handler that issued it, taken from
+the request's metrics holder. Listeners run on Motor's executor threads, so records
+are handed to the event loop and written by run_slow_query_recorder, which also runs
+explain("executionStats") on reads, updates and deletes to capture documents and keys
+examined against documents returned. A shape is explained at most once per
+SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS. Records go to the capped slow_queries collection
+and are served by GET /admin/slow-queries.
+"""
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Any, Optional
+from pymongo import monitoring
+from pymongo.errors import CollectionInvalid
+from app.config import settings
+from app.utils.metrics import current_request
+
+SLOW_QUERY_COLLECTION = "slow_queries"
+SLOW_QUERY_QUEUE_SIZE = 1000
+REDACTED = "?"
+
+# Infrastructure collections: tailable getMores on them block by design
+IGNORED_COLLECTIONS = {SLOW_QUERY_COLLECTION, "cache_invalidations"}
+IGNORED_COMMANDS = {"explain", "hello", "ismaster", "isMaster", "ping", "endSessions", "killCursors"}
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct", "update", "delete", "findAndModify"}
+
+# Driver and session bookkeeping; not part of the query and not accepted by explain
+SESSION_FIELDS = {
+    "lsid", "txnNumber", "$db", "$clusterTime", "$readPreference", "readConcern", "writeConcern",
+    "autocommit", "startTransaction", "apiVersion", "apiStrict", "apiDeprecationErrors",
+}
+# Structure rather than data: kept verbatim in the shape. $project is not among them
+# since computed fields can carry literal values.
+STRUCTURAL_FIELDS = {
+    "sort", "projection", "hint", "limit", "skip", "batchSize", "$sort", "$limit", "$skip",
+}
+# Documents of insert, update and delete commands (insert_many, bulk_write)
+BULK_FIELDS = {"documents", "updates", "deletes"}
+
+
+def _collapse(items: list) -> dict:
+    """Many documents stand for one: the first one's shape and how many there were"""
+    return {"$first": items[0], "$count": len(items)}
+
+
+def redact(value: Any, bulk: bool = False) -> Any:
+    """The shape of a command: keys and operators kept, literal values replaced"""
+    if isinstance(value, dict):
+        return {
+            key: item if key in STRUCTURAL_FIELDS else redact(item, key in BULK_FIELDS)
+            for key, item in value.items()
+            if key not in SESSION_FIELDS
+        }
+    if isinstance(value, (list, tuple)):
+        items = [redact(item) for item in value]
+        if not items:
+            return []
+        # Lists of literals ($in) collapse to one entry
+        if all(not isinstance(item, (dict, list)) for item in items):
+            return [REDACTED]
+        # So do bulk documents and lists of same-shaped subdocuments, which would
+        # otherwise record one copy per document
+        if bulk or (len(items) > 1 and all(item == items[0] for item in items)):
+            return _collapse(items)
+        return items
+    return REDACTED
+
+
+def _collection(command_name: str, command: dict) -> Optional[str]:
+    target = command.get("collection") if command_name == "getMore" else command.get(command_name)
+    return target if isinstance(target, str) else None
+
+
+def command_shape(command_name: str, command: dict) -> dict:
+    shape = redact(command)
+    # The first key names the collection, which is kept
+    if command_name in shape:
+        shape[command_name] = command[command_name]
+    return shape
+
+
+class SlowQueryListener(monitoring.CommandListener):
+    def __init__(self):
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.queue: Optional[asyncio.Queue] = None
+        self.dropped = 0
+        self._pending: dict[tuple, tuple[dict, Optional[str], Optional[str]]] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        if self.loop is None or event.command_name in IGNORED_COMMANDS:
+            return
+        if _collection(event.command_name, event.command) in IGNORED_COLLECTIONS:
+            return
+        stats = current_request.get()
+        origin = (stats.route, stats.handler) if stats is not None else (None, None)
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (event.command, *origin)
+
+    def _finished(self, event, outcome: str):
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+        loop = self.loop
+        if pending is None or loop is None or event.duration_micros < settings.slow_query_threshold_ms * 1000:
+            return
+        command, route, handler = pending
+        record = {
+            "command": event.command_name,
+            "database": event.database_name,
+            "collection": _collection(event.command_name, command),
+            "shape": command_shape(event.command_name, command),
+            "duration_ms": event.duration_micros / 1000,
+            "route": route,
+            "handler": handler,
+            "outcome": outcome,
+            "created_at": datetime.utcnow(),
+        }
+        loop.call_soon_threadsafe(self._enqueue, record, command)
+
+    def _enqueue(self, record: dict, command: dict):
+        try:
+            self.queue.put_nowait((record, command))
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def succeeded(self, event):
+        self._finished(event, "ok")
+
+    def failed(self, event):
+        self._finished(event, "error")
+
+
+slow_query_listener = SlowQueryListener()
+
+
+def _shape_key(record: dict) -> str:
+    shape = json.dumps([record["command"], record["collection"], record["shape"]], sort_keys=True, default=str)
+    return hashlib.sha1(shape.encode()).hexdigest()
+
+
+def _execution_stats(explained: dict) -> Optional[dict]:
+    # Aggregations report the stats of their initial $cursor stage
+    if "executionStats" in explained:
+        return explained["executionStats"]
+    for stage in explained.get("stages", []):
+        if "$cursor" in stage:
+            return stage["$cursor"].get("executionStats")
+    return None
+
+
+def _plan_stages(plan: Optional[dict]) -> list[str]:
+    stages = []
+    while plan:
+        stages.append(plan.get("stage"))
+        plan = plan.get("inputStage") or (plan.get("inputStages") or [None])[0]
+    return stages
+
+
+async def explain(db, command: dict) -> Optional[dict]:
+    query = {key: value for key, value in command.items() if key not in SESSION_FIELDS}
+    explained = await db.command({"explain": query, "verbosity": "executionStats"})
+    stats = _execution_stats(explained)
+    if stats is None:
+        return None
+    return {
+        "docs_examined": stats.get("totalDocsExamined"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "returned": stats.get("nReturned"),
+        "execution_ms": stats.get("executionTimeMillis"),
+        "plan": _plan_stages(stats.get("executionStages")),
+    }
+
+
+async def ensure_slow_query_log(db):
+    try:
+        await db.create_collection(
+            SLOW_QUERY_COLLECTION,
+            capped=True,
+            size=settings.slow_query_log_mb * 1024 * 1024,
+        )
+    except CollectionInvalid:
+        pass  # Already created by another worker
+
+
+async def run_slow_query_recorder(db):
+    """Write slow-query records (with their explain output) for the lifetime of the process"""
+    try:
+        await ensure_slow_query_log(db)
+    except Exception as e:
+        print(f"Slow query log disabled: {e}")
+        return
+    listener = slow_query_listener
+    listener.queue = asyncio.Queue(maxsize=SLOW_QUERY_QUEUE_SIZE)
+    listener.loop = asyncio.get_running_loop()
+    explained_at: dict[str, float] = {}
+    try:
+        while True:
+            record, command = await listener.queue.get()
+            try:
+                key = record["shape_hash"] = _shape_key(record)
+                now = time.monotonic()
+                due = now - explained_at.get(key, float("-inf")) >= settings.slow_query_explain_interval_seconds
+                if settings.slow_query_explain and record["command"] in EXPLAINABLE_COMMANDS and due:
+                    explained_at[key] = now
+                    try:
+                        record["explain"] = await explain(db.client[record["database"]], command)
+                    except Exception as e:
+                        # The command may be gone (dropped collection) or not explainable here
+                        record["explain_error"] = str(e)
+                await db[SLOW_QUERY_COLLECTION].insert_one(record)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Slow query recorder error: {e}")
+    finally:
+        listener.loop = None
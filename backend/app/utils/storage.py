@@ -0,0 +1,104 @@
+import hashlib
+import os
+import tempfile
+from typing import NamedTuple
+from fastapi import HTTPException, UploadFile, status
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import PlainTextResponse
+from app.config import settings
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Room for the multipart boundaries and headers around the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class StoredFile(NamedTuple):
+    path: str
+    sha256: str
+    size: int
+
+
+def max_upload_bytes() -> int:
+    return settings.max_upload_size_mb * 1024 * 1024
+
+
+def _write_chunk(out, digest, chunk: bytes):
+    out.write(chunk)
+    digest.update(chunk)
+
+
+def discard_file(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def stream_upload(upload: UploadFile, directory: str) -> StoredFile:
+    """Stream an upload into a temporary file in `directory` without blocking the event loop.
+
+    The size cap is enforced and the SHA-256 computed in the same pass. The caller
+    renames the returned temporary file into place, so a failed or oversized upload
+    never replaces stored content.
+    """
+    limit = max_upload_bytes()
+    await run_in_threadpool(os.makedirs, directory, exist_ok=True)
+    fd, tmp_path = await run_in_threadpool(tempfile.mkstemp, dir=directory, prefix=".upload-", suffix=".part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > limit:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"File exceeds the {settings.max_upload_size_mb} MB limit"
+                    )
+                await run_in_threadpool(_write_chunk, out, digest, chunk)
+    except BaseException:
+        await run_in_threadpool(discard_file, tmp_path)
+        raise
+    return StoredFile(path=tmp_path, sha256=digest.hexdigest(), size=size)
+
+
+class UploadSizeLimitMiddleware:
+    """Rejects oversized submission uploads while the body is still streaming in.
+
+    Form parsing spools the whole body before the handler runs, so the cap has to be
+    applied at the ASGI layer: by Content-Length up front, and by counting bytes for
+    chunked bodies.
+    """
+
+    def __init__(self, app, path_suffix: str = "/submit"):
+        self.app = app
+        self.path_suffix = path_suffix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].endswith(self.path_suffix):
+            await self.app(scope, receive, send)
+            return
+
+        limit = max_upload_bytes() + MULTIPART_OVERHEAD
+        too_large = PlainTextResponse("Request body too large", status_code=413)
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            await too_large(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail="Request body too large"
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
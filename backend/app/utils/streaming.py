@@ -0,0 +1,98 @@
+"""
+Streaming exports for list endpoints.
+
+A list endpoint streams instead of paging when the client sends
+Accept: application/x-ndjson (one JSON document per line) or ?stream=1 (a JSON array).
+Documents are serialized batch by batch straight off the Motor cursor, and the next
+batch is only fetched once the previous chunk has been handed to the client. Memory
+therefore stays bounded by one batch whatever the size of the export.
+"""
+from typing import Awaitable, Callable, Optional
+from fastapi import Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+from app.utils.pagination import PAGE_SORT, keyset_query
+
+NDJSON = "application/x-ndjson"
+STREAM_BATCH_SIZE = 500
+
+
+class StreamParams:
+    """Opt-in streaming for a list endpoint; `format` is None for the paged response"""
+
+    def __init__(
+        self,
+        request: Request,
+        stream: bool = Query(False, description="Stream every matching item as a JSON array instead of one page"),
+    ):
+        if NDJSON in request.headers.get("accept", ""):
+            self.format = "ndjson"
+        elif stream:
+            self.format = "json"
+        else:
+            self.format = None
+
+
+async def _serialize(
+    cursor,
+    model: type[BaseModel],
+    fmt: str,
+    prepare: Optional[Callable[[list[dict]], Awaitable[None]]],
+):
+    first = True
+    if fmt == "json":
+        yield b"["
+    batch = []
+
+    async def flush():
+        nonlocal first
+        if prepare:
+            await prepare(batch)
+        lines = []
+        for doc in batch:
+            doc["id"] = str(doc.pop("_id"))
+            try:
+                item = model(**doc).model_dump_json()
+            except ValidationError as e:
+                # Same policy as the paged listings: skip documents that do not validate
+                print(f"Skipping {model.__name__} {doc['id']} in export: {e}")
+                continue
+            if fmt == "ndjson":
+                lines.append(item + "\n")
+            else:
+                lines.append(item if first else "," + item)
+            first = False
+        batch.clear()
+        return "".join(lines).encode()
+
+    async for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= STREAM_BATCH_SIZE:
+            yield await flush()
+    if batch:
+        yield await flush()
+    if fmt == "json":
+        yield b"]"
+
+
+def stream_documents(
+    collection,
+    query: dict,
+    model: type[BaseModel],
+    params: StreamParams,
+    start_cursor: Optional[str] = None,
+    projection: Optional[dict] = None,
+    prepare: Optional[Callable[[list[dict]], Awaitable[None]]] = None,
+) -> StreamingResponse:
+    """Stream every document matching `query` in page order, optionally after a page cursor.
+
+    `prepare` runs on each raw batch before serialization, e.g. to strip fields or
+    resolve related details with one query per batch.
+    """
+    cursor = (
+        collection.find(keyset_query(query, start_cursor), projection)
+        .sort(PAGE_SORT)
+        .batch_size(STREAM_BATCH_SIZE)
+    )
+    media_type = NDJSON if params.format == "ndjson" else "application/json"
+    return StreamingResponse(_serialize(cursor, model, params.format, prepare), media_type=media_type)
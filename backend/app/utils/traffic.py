@@ -0,0 +1,122 @@
+"""
+Opt-in capture of request metadata, replayed by benchmarks.replay.
+
+When TRAFFIC_CAPTURE_DIR is set, TrafficCaptureMiddleware appends one JSON line per
+request to traffic-<pid>.ndjson in that directory, rotated at TRAFFIC_CAPTURE_MAX_MB
+with TRAFFIC_CAPTURE_FILES old files kept. A record holds the route template and
+method, the caller's role, query parameters, status and timing. Bodies, headers and
+tokens are never read. Ids in the path and the caller's id are replaced by keyed
+hashes, which keep repeat visits recognizable without revealing the ids; query values
+other than a few enumerations are replaced by "?". Lines are written by a logging
+QueueListener thread, off the event loop.
+"""
+import hashlib
+import hmac
+import logging
+import os
+import queue
+import random
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+from urllib.parse import parse_qsl
+import orjson
+from bson import ObjectId
+from app.config import settings
+
+REDACTED = "?"
+# Query parameters whose values are enumerations or sizes, never user data
+SAFE_QUERY_PARAMS = {"limit", "role", "mode", "stream", "status", "min_duration_ms"}
+SKIPPED_PATHS = {"/metrics", "/health"}
+
+_listener: Optional[QueueListener] = None
+
+
+def pseudonym(value: str) -> str:
+    digest = hmac.new(settings.secret_key.encode(), value.encode(), hashlib.sha256).hexdigest()
+    return f"id:{digest[:16]}"
+
+
+def _sanitize_path_params(params: dict) -> dict:
+    return {
+        name: pseudonym(value) if ObjectId.is_valid(value) else REDACTED
+        for name, value in params.items()
+    }
+
+
+def _sanitize_query(query_string: bytes) -> dict:
+    query = {}
+    for name, value in parse_qsl(query_string.decode("latin-1"), keep_blank_values=True):
+        query[name] = value if name in SAFE_QUERY_PARAMS else REDACTED
+    return query
+
+
+def _open_log() -> logging.Logger:
+    global _listener
+    os.makedirs(settings.traffic_capture_dir, exist_ok=True)
+    # One file per worker process, so lines from different workers never interleave
+    handler = RotatingFileHandler(
+        os.path.join(settings.traffic_capture_dir, f"traffic-{os.getpid()}.ndjson"),
+        maxBytes=settings.traffic_capture_max_mb * 1024 * 1024,
+        backupCount=settings.traffic_capture_files,
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    records = queue.SimpleQueue()
+    _listener = QueueListener(records, handler)
+    _listener.start()
+
+    log = logging.getLogger("app.traffic")
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    log.addHandler(QueueHandler(records))
+    return log
+
+
+def shutdown_capture():
+    """Flush and close the capture file"""
+    global _listener
+    if _listener:
+        _listener.stop()
+        _listener = None
+
+
+class TrafficCaptureMiddleware:
+    def __init__(self, app, sample_rate: float = 1.0):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.log = _open_log()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in SKIPPED_PATHS or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        timestamp = time.time()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            route = scope.get("route")
+            # Unmatched paths (scanners, typos) cannot be replayed
+            if route is not None:
+                user = scope.get("state", {}).get("user")
+                self.log.info(orjson.dumps({
+                    "ts": timestamp,
+                    "method": scope["method"],
+                    "route": route.path,
+                    "params": _sanitize_path_params(scope.get("path_params", {})),
+                    "query": _sanitize_query(scope.get("query_string", b"")),
+                    "role": user.role if user else None,
+                    "user": pseudonym(user.id) if user else None,
+                    "status": status_code,
+                    "duration_ms": round(duration_ms, 3),
+                }).decode())
@@ -0,0 +1,129 @@
+"""
+Status state machine for tasks, requests and projects.
+
+Each transition is applied as one compare-and-set find_one_and_update whose filter
+holds the id, the owner and the statuses the target may be entered from, so there is
+no read-check-write window. Only a failed match costs a second read, which tells a
+missing document (404) from a foreign one (403) and a stale status (409).
+"""
+from datetime import datetime
+from typing import NamedTuple, Optional
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+from app.models.user import User
+
+
+class Transition(NamedTuple):
+    sources: frozenset
+    roles: frozenset
+
+
+def _t(sources: set, roles: set) -> Transition:
+    return Transition(frozenset(sources), frozenset(roles))
+
+
+PROJECT_STATUSES = {"open", "assigned", "in_progress", "completed", "cancelled"}
+
+# collection -> target status -> (statuses it may be entered from, roles allowed to move)
+TRANSITIONS = {
+    # "submitted" is entered only through POST /tasks/{id}/submit, which carries the file
+    "tasks": {
+        "in_progress": _t({"pending", "rejected"}, {"problem_solver"}),
+        "pending": _t({"in_progress"}, {"problem_solver"}),
+        "completed": _t({"submitted"}, {"buyer"}),
+        "rejected": _t({"submitted"}, {"buyer"}),
+    },
+    "requests": {
+        "accepted": _t({"pending"}, {"buyer"}),
+        "rejected": _t({"pending"}, {"buyer"}),
+    },
+    # The owner or an admin may move a project to any status, as before; the CAS still
+    # guards ownership and makes concurrent status changes apply one at a time
+    "projects": {
+        status: _t(PROJECT_STATUSES, {"buyer", "admin"}) for status in PROJECT_STATUSES
+    },
+}
+
+_LABELS = {"tasks": "Task", "requests": "Request", "projects": "Project"}
+
+
+async def _project_buyer(db, doc: dict, session=None) -> Optional[str]:
+    project = await db.projects.find_one(
+        {"_id": ObjectId(doc["project_id"])}, {"buyer_id": 1}, session=session
+    )
+    return project["buyer_id"] if project else None
+
+
+# Owner fields added after documents already existed, resolved the old way when absent
+_LEGACY_OWNERS = {
+    ("tasks", "buyer_id"): _project_buyer,
+    ("requests", "buyer_id"): _project_buyer,
+}
+
+
+async def transition(
+    db,
+    collection: str,
+    doc_id: str,
+    current_user: User,
+    target: Optional[str] = None,
+    owner_field: Optional[str] = None,
+    changes: Optional[dict] = None,
+    return_document=ReturnDocument.AFTER,
+    session=None,
+) -> dict:
+    """Move a document to `target` (or just apply `changes` when target is None).
+
+    owner_field names the field that must equal the current user's id; pass None to
+    skip the ownership check (admins).
+    """
+    label = _LABELS[collection]
+    if not ObjectId.is_valid(doc_id):
+        raise HTTPException(status_code=400, detail=f"Invalid {label.lower()} ID")
+
+    query = {"_id": ObjectId(doc_id)}
+    update = {**(changes or {}), "updated_at": datetime.utcnow()}
+    if target is not None:
+        allowed = TRANSITIONS[collection].get(target)
+        if allowed is None:
+            raise HTTPException(status_code=409, detail=f"{label} cannot be set to {target}")
+        if current_user.role not in allowed.roles:
+            raise HTTPException(status_code=403, detail="Not authorized")
+        query["status"] = {"$in": sorted(allowed.sources)}
+        update["status"] = target
+
+    guarded = {**query, owner_field: current_user.id} if owner_field else query
+    doc = await db[collection].find_one_and_update(
+        guarded, {"$set": update}, return_document=return_document, session=session
+    )
+    if doc:
+        return doc
+
+    # No match: find out which condition failed
+    current = await db[collection].find_one({"_id": query["_id"]}, session=session)
+    if not current:
+        raise HTTPException(status_code=404, detail=f"{label} not found")
+    if owner_field:
+        owner = current.get(owner_field)
+        legacy = _LEGACY_OWNERS.get((collection, owner_field))
+        if owner is None and legacy:
+            owner = await legacy(db, current, session=session)
+            if owner == current_user.id:
+                # Backfill the owner so the next transition needs no fallback
+                update[owner_field] = owner
+                doc = await db[collection].find_one_and_update(
+                    query, {"$set": update}, return_document=return_document, session=session
+                )
+                if doc:
+                    return doc
+                current = await db[collection].find_one({"_id": query["_id"]}, session=session) or current
+        if owner != current_user.id:
+            raise HTTPException(status_code=403, detail="Not authorized")
+    if target is None:
+        # Only ownership was guarded, so the document went away in between
+        raise HTTPException(status_code=404, detail=f"{label} not found")
+    raise HTTPException(
+        status_code=409,
+        detail=f"{label} cannot move from {current.get('status')} to {target}",
+    )
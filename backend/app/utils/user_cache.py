@@ -0,0 +1,151 @@
+"""
+Process-wide cache of user summaries (id -> email, full_name, role).
+
+The UserLoader consults it before querying db.users. Writes that change a user go
+through write-through helpers that refresh this process's cache and append a note to
+the capped cache_invalidations collection; every worker tails that collection and
+drops the user from its own caches (including cached principals). A worker that
+falls so far behind that its place in the log is overwritten clears its caches.
+Entries also expire after a TTL, which bounds staleness if a note is missed.
+"""
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid
+from app.config import settings
+from app.utils.auth import principal_cache
+
+SUMMARY_FIELDS = ("email", "full_name", "role")
+NOTIFICATION_COLLECTION = "cache_invalidations"
+NOTIFICATION_LOG_BYTES = 1024 * 1024
+NOTIFICATION_LOG_MAX_DOCS = 10000
+NOTIFICATION_RETRY_SECONDS = 1.0
+
+# Identifies this process so it skips its own notes
+PROCESS_ID = uuid.uuid4().hex
+
+
+def user_summary(user: dict) -> dict:
+    return {field: user.get(field) for field in SUMMARY_FIELDS}
+
+
+class UserSummaryCache:
+    """Bounded LRU of user summaries whose entries expire after ttl_seconds"""
+
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: str) -> Optional[dict]:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] <= time.time():
+            if entry is not None:
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, user_id: str, user: dict):
+        self._entries.pop(user_id, None)
+        self._entries[user_id] = (time.time() + self.ttl_seconds, user_summary(user))
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str):
+        self._entries.pop(user_id, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+user_cache = UserSummaryCache(
+    max_size=settings.user_cache_size,
+    ttl_seconds=settings.user_cache_ttl_seconds,
+)
+
+
+async def user_changed(db, user: dict):
+    """Write-through after a user document changed: refresh locally, notify other workers"""
+    user_id = str(user["_id"])
+    user_cache.put(user_id, user)
+    principal_cache.invalidate_user(user_id)
+    await db[NOTIFICATION_COLLECTION].insert_one({
+        "user_id": user_id,
+        "origin": PROCESS_ID,
+        "created_at": datetime.utcnow(),
+    })
+
+
+def _apply(note: dict):
+    if note.get("origin") == PROCESS_ID:
+        return
+    user_cache.invalidate(note["user_id"])
+    principal_cache.invalidate_user(note["user_id"])
+
+
+async def ensure_notification_log(db):
+    try:
+        await db.create_collection(
+            NOTIFICATION_COLLECTION,
+            capped=True,
+            size=NOTIFICATION_LOG_BYTES,
+            max=NOTIFICATION_LOG_MAX_DOCS,
+        )
+    except CollectionInvalid:
+        pass  # Already created by another worker
+
+
+async def watch_invalidations(db):
+    """Tail the notification log for the lifetime of the process"""
+    collection = db[NOTIFICATION_COLLECTION]
+    started = False
+    last_id = None
+    while True:
+        try:
+            if not started:
+                await ensure_notification_log(db)
+                # Start after the newest note; older ones predate this process's cache
+                newest = await collection.find_one(sort=[("$natural", -1)])
+                last_id = newest["_id"] if newest else None
+                started = True
+            elif last_id is not None and not await collection.find_one({"_id": last_id}, {"_id": 1}):
+                # The cap evicted our place in the log, so notes may have been missed
+                user_cache.clear()
+                principal_cache.clear()
+                last_id = None
+            # Ids from different workers are not ordered, so resume by position in the
+            # log rather than by id: read it in insertion order and skip up to the last
+            # note seen
+            skipping = last_id is not None
+            cursor = collection.find({}, cursor_type=CursorType.TAILABLE_AWAIT)
+            async for note in cursor:
+                if skipping:
+                    skipping = note["_id"] != last_id
+                    continue
+                last_id = note["_id"]
+                _apply(note)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"User cache invalidation watcher error: {e}")
+        # The cursor dies on an empty log or when it falls behind the cap
+        await asyncio.sleep(NOTIFICATION_RETRY_SECONDS)
@@ -0,0 +1,69 @@
+"""
+Shared helpers for the benchmark scripts.
+They run against a local mongod (BENCH_MONGODB_URL, default mongodb://localhost:27017)
+and never touch the database configured in .env.
+"""
+import os
+import time
+from collections import Counter
+from pymongo import monitoring
+from motor.motor_asyncio import AsyncIOMotorClient
+
+BENCH_MONGODB_URL = os.getenv("BENCH_MONGODB_URL", "mongodb://localhost:27017")
+BENCH_DATABASE_NAME = os.getenv("BENCH_DATABASE_NAME", "marketplace_bench")
+
+# The app settings require these; point them at the benchmark database so app
+# modules can be imported by the scripts.
+os.environ.setdefault("MONGODB_URL", BENCH_MONGODB_URL)
+os.environ.setdefault("DATABASE_NAME", BENCH_DATABASE_NAME)
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Counts the commands (round-trips) sent to the server, in total and per collection"""
+
+    def __init__(self):
+        self.count = 0
+        self.by_collection = Counter()
+
+    def reset(self):
+        self.count = 0
+        self.by_collection.clear()
+
+    def started(self, event):
+        # getMore batches are round-trips too, so they are counted
+        self.count += 1
+        target = event.command.get(event.command_name)
+        if isinstance(target, str):
+            self.by_collection[(event.command_name, target)] += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def connect(counter: CommandCounter = None):
+    listeners = [counter] if counter else []
+    client = AsyncIOMotorClient(BENCH_MONGODB_URL, event_listeners=listeners)
+    return client, client[BENCH_DATABASE_NAME]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+async def timed(coro_fn, iterations: int) -> list[float]:
+    """Run coro_fn `iterations` times and return the latencies in milliseconds"""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await coro_fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
@@ -0,0 +1,103 @@
+"""
+Concurrency check: N simultaneous accepts of different requests on one project.
+
+Seeds an open project with N pending requests from distinct solvers, then has the
+buyer accept all of them at once through the app (in-process). Exactly one accept
+may win: it gets 200, the rest 409, and the database must show the project assigned
+to the winner with every other request rejected. Exits non-zero otherwise.
+
+Needs a replica set (transactions), e.g. mongod --replSet rs0 followed by rs.initiate().
+
+Usage: python -m benchmarks.concurrent_accepts [--requests 100]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from bson import ObjectId
+import httpx
+from benchmarks.common import BENCH_DATABASE_NAME
+from app.database import connect_to_mongo, close_mongo_connection, get_database
+from app.utils.auth import create_access_token
+from app.main import app
+
+
+async def seed(db, size: int):
+    buyer_id = ObjectId()
+    solvers = [ObjectId() for _ in range(size)]
+    await db.users.insert_many(
+        [{"_id": buyer_id, "email": "buyer@bench.example.com", "full_name": "Buyer", "role": "buyer"}]
+        + [{"_id": oid, "email": f"solver{i}@bench.example.com", "full_name": f"Solver {i}", "role": "problem_solver"}
+           for i, oid in enumerate(solvers)]
+    )
+    now = datetime.utcnow()
+    project = await db.projects.insert_one({
+        "title": "Contended project",
+        "description": "Benchmark project",
+        "requirements": [],
+        "buyer_id": str(buyer_id),
+        "assigned_solver_id": None,
+        "status": "open",
+        "created_at": now,
+        "updated_at": now,
+    })
+    requests = await db.requests.insert_many([
+        {
+            "project_id": str(project.inserted_id),
+            "solver_id": str(oid),
+            "buyer_id": str(buyer_id),
+            "message": None,
+            "status": "pending",
+            "created_at": now,
+            "updated_at": now,
+        }
+        for oid in solvers
+    ])
+    return project.inserted_id, [str(oid) for oid in requests.inserted_ids]
+
+
+async def main(size: int) -> bool:
+    await connect_to_mongo()
+    db = get_database()
+    try:
+        project_id, request_ids = await seed(db, size)
+        token = create_access_token({"sub": "buyer@bench.example.com"})
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60,
+                                     headers={"Authorization": f"Bearer {token}"}) as client:
+            start = time.perf_counter()
+            responses = await asyncio.gather(*[
+                client.patch(f"/requests/{request_id}", json={"status": "accepted"})
+                for request_id in request_ids
+            ])
+            elapsed = (time.perf_counter() - start) * 1000
+
+        statuses = Counter(response.status_code for response in responses)
+        winners = [response.json() for response in responses if response.status_code == 200]
+        project = await db.projects.find_one({"_id": project_id})
+        stored = Counter([req["status"] async for req in db.requests.find({"project_id": str(project_id)})])
+
+        print(f"{size} accepts in {elapsed:.0f} ms, statuses: {dict(statuses)}")
+        print(f"project: status={project['status']} assigned_solver_id={project['assigned_solver_id']}")
+        print(f"requests: {dict(stored)}")
+
+        ok = (
+            statuses == Counter({200: 1, 409: size - 1})
+            and project["status"] == "assigned"
+            and project["assigned_solver_id"] == winners[0]["solver_id"]
+            and stored == Counter({"accepted": 1, "rejected": size - 1})
+        )
+        print("PASS: exactly one winner" if ok else "FAIL")
+        return ok
+    finally:
+        await db.client.drop_database(BENCH_DATABASE_NAME)
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100)
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(main(args.requests)) else 1)
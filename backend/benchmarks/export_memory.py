@@ -0,0 +1,117 @@
+"""
+Benchmark: server memory while exporting every user through GET /users/.
+
+Seeds N users (default 1M), starts the API with uvicorn in a subprocess and streams
+the export as NDJSON and as a JSON array while sampling the server's RSS. Streaming
+serializes one cursor batch at a time, so RSS should stay flat however many users are
+exported. Reports RSS at each 10% of progress and the peak growth over idle. Linux
+only (reads /proc/<pid>/status).
+
+Usage: python -m benchmarks.export_memory [--users 1000000] [--port 8765]
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+import httpx
+from benchmarks.common import connect
+from app.utils.auth import create_access_token
+
+SEED_BATCH = 10000
+
+
+def rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+async def seed(db, size: int):
+    await db.users.delete_many({})
+    start = datetime.utcnow()
+    await db.users.insert_one({
+        "email": "admin@bench.example.com", "full_name": "Admin", "role": "admin",
+        "created_at": start, "updated_at": start,
+    })
+    for offset in range(0, size, SEED_BATCH):
+        await db.users.insert_many([
+            {
+                "email": f"user{i}@bench.example.com",
+                "full_name": f"User {i}",
+                "role": "problem_solver",
+                "hashed_password": "x" * 60,
+                "created_at": start + timedelta(microseconds=i),
+                "updated_at": start,
+            }
+            for i in range(offset, min(offset + SEED_BATCH, size))
+        ])
+
+
+async def wait_until_up(client: httpx.AsyncClient):
+    for _ in range(100):
+        try:
+            await client.get("/health")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError("API did not start")
+
+
+async def export(client: httpx.AsyncClient, pid: int, total: int, label: str, **request):
+    baseline = rss_mb(pid)
+    peak = baseline
+    received = lines = 0
+    next_mark = 0.1
+    start = time.perf_counter()
+    print(f"\n{label}: idle RSS {baseline:.1f} MB")
+    async with client.stream("GET", "/users/", **request) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes():
+            received += len(chunk)
+            lines += chunk.count(b"\n") if label == "ndjson" else chunk.count(b'"email"')
+            peak = max(peak, rss_mb(pid))
+            while lines >= next_mark * total:
+                print(f"  {next_mark:>4.0%}  {received / 1e6:8.1f} MB sent  RSS {rss_mb(pid):7.1f} MB")
+                next_mark += 0.1
+    elapsed = time.perf_counter() - start
+    print(f"  {lines} items, {received / 1e6:.1f} MB in {elapsed:.1f} s; "
+          f"peak RSS {peak:.1f} MB (+{peak - baseline:.1f} MB over idle)")
+
+
+async def main(size: int, port: int):
+    mongo, db = connect()
+    server = None
+    try:
+        print(f"Seeding {size} users...")
+        await seed(db, size)
+
+        # The subprocess inherits the benchmark database settings from benchmarks.common
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+            env=os.environ.copy(),
+        )
+        token = create_access_token({"sub": "admin@bench.example.com"}, expires_delta=timedelta(hours=2))
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=None,
+                                     headers={"Authorization": f"Bearer {token}"}) as client:
+            await wait_until_up(client)
+            await export(client, server.pid, size + 1, "ndjson", headers={"Accept": "application/x-ndjson"})
+            await export(client, server.pid, size + 1, "json", params={"stream": 1})
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+        await mongo.drop_database(db.name)
+        mongo.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.port))
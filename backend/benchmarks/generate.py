@@ -0,0 +1,277 @@
+"""
+Synthetic data generator: a realistic marketplace at any scale, for the load driver.
+
+Creates admins, buyers and solvers, then for each buyer a set of projects spread
+across the lifecycle (open, assigned, in progress, completed, cancelled). Open
+projects collect pending requests; assigned ones have one accepted request with an
+approved plan and its milestones, the rest rejected, and tasks whose statuses follow
+the project's. Documents have the same fields the API writes (including the
+denormalized party details) and are inserted with insert_many in batches, so millions
+of documents take minutes. The same --seed produces the same data, ids included.
+
+Every user's password is "bench-password" and emails follow
+{admin,buyer,solver}<n>@bench.example.com. The benchmark database is dropped first.
+
+Usage: python -m benchmarks.generate [--buyers 200] [--solvers 800] [--projects-per-buyer 10] [--seed 1]
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from bson import ObjectId
+from benchmarks.common import connect
+from app.indexes import ensure_indexes
+from app.utils.auth import get_password_hash
+from app.utils.party_details import party_fields
+
+PASSWORD = "bench-password"
+INSERT_BATCH = 10000
+HISTORY_DAYS = 180
+
+PROJECT_STATUSES = {"open": 40, "assigned": 15, "in_progress": 25, "completed": 15, "cancelled": 5}
+WORDS = (
+    "python fastapi react mongodb data pipeline dashboard mobile api integration payment "
+    "analytics machine learning scraper migration redesign testing automation cloud aws "
+    "docker kubernetes security audit chatbot search reporting inventory booking crm"
+).split()
+SKILLS = ["python", "javascript", "typescript", "go", "sql", "mongodb", "react", "devops", "ml", "design"]
+
+
+class Generator:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.now = datetime(2024, 6, 1)
+        self.hashed_password = get_password_hash(PASSWORD)
+        self.solvers: list[dict] = []
+
+    def oid(self) -> ObjectId:
+        return ObjectId(self.rng.randbytes(12))
+
+    def moment(self, after: datetime = None) -> datetime:
+        start = after or self.now - timedelta(days=HISTORY_DAYS)
+        span = max(1, int((self.now - start).total_seconds()))
+        return start + timedelta(seconds=self.rng.randrange(span), microseconds=self.rng.randrange(1000000))
+
+    def phrase(self, words: int) -> str:
+        return " ".join(self.rng.choice(WORDS) for _ in range(words))
+
+    def user(self, role: str, index: int) -> dict:
+        created = self.moment()
+        profile = None
+        if role == "problem_solver":
+            profile = {"bio": f"Freelancer working on {self.phrase(4)}",
+                       "skills": self.rng.sample(SKILLS, 3), "experience_years": self.rng.randint(1, 15)}
+        name = {"admin": "admin", "buyer": "buyer", "problem_solver": "solver"}[role]
+        return {
+            "_id": self.oid(),
+            "email": f"{name}{index}@bench.example.com",
+            "full_name": f"{name.title()} {index}",
+            "role": role,
+            "hashed_password": self.hashed_password,
+            "profile": profile,
+            "created_at": created,
+            "updated_at": created,
+        }
+
+    def users(self):
+        for role, count in (("admin", self.args.admins), ("buyer", self.args.buyers),
+                            ("problem_solver", self.args.solvers)):
+            for index in range(count):
+                user = self.user(role, index)
+                if role == "problem_solver":
+                    self.solvers.append(user)
+                yield "users", user
+
+    def milestones(self, plan_id: str, count: int, project_status: str, created: datetime):
+        done = {"completed": count, "in_progress": self.rng.randint(0, count)}.get(project_status, 0)
+        embedded, docs = [], []
+        for index in range(count):
+            base = {
+                "title": f"Milestone {index + 1}: {self.phrase(2)}",
+                "description": self.phrase(8),
+                "deadline": created + timedelta(days=7 * (index + 1)),
+                "estimated_hours": float(self.rng.randint(4, 40)),
+            }
+            if index < done:
+                status = "completed"
+            elif index == done and project_status == "in_progress":
+                status = "in_progress"
+            else:
+                status = "pending"
+            embedded.append(base)
+            docs.append({
+                **base,
+                "_id": self.oid(),
+                "plan_id": plan_id,
+                "status": status,
+                "completed_at": created + timedelta(days=index + 1) if status == "completed" else None,
+                "notes": None,
+                "created_at": created,
+                "updated_at": created,
+            })
+        return embedded, docs, done
+
+    def plan(self, request: dict, solver: dict, status: str, project_status: str, buyer: dict):
+        created = self.moment(request["created_at"])
+        plan_id = self.oid()
+        count = self.rng.randint(1, self.args.milestones_per_plan)
+        embedded, milestones, done = self.milestones(str(plan_id), count, project_status, created)
+        plan = {
+            "_id": plan_id,
+            "request_id": str(request["_id"]),
+            "title": f"Plan for {self.phrase(3)}",
+            "description": self.phrase(20),
+            "estimated_days": self.rng.randint(3, 60),
+            "milestones": embedded,
+            "solver_id": str(solver["_id"]),
+            "status": status,
+            "progress_percentage": round(100.0 * done / count, 2),
+            "milestones_total": count,
+            "milestones_completed": done,
+            "approved_at": created if status == "approved" else None,
+            "approved_by": str(buyer["_id"]) if status == "approved" else None,
+            "created_at": created,
+            "updated_at": created,
+        }
+        yield "plans", plan
+        for milestone in milestones:
+            yield "milestones", milestone
+
+    def tasks(self, project: dict, solver: dict):
+        statuses = {
+            "assigned": ["pending"],
+            "in_progress": ["pending", "in_progress", "in_progress", "submitted", "completed", "rejected"],
+            "completed": ["completed"],
+        }[project["status"]]
+        for index in range(self.rng.randint(1, self.args.tasks_per_project)):
+            created = self.moment(project["created_at"])
+            status = self.rng.choice(statuses)
+            submitted = status in ("submitted", "completed", "rejected")
+            yield "tasks", {
+                "_id": self.oid(),
+                "title": f"Task {index + 1}: {self.phrase(3)}",
+                "description": self.phrase(12),
+                "deadline": created + timedelta(days=14),
+                "metadata": None,
+                "project_id": str(project["_id"]),
+                "solver_id": str(solver["_id"]),
+                "buyer_id": project["buyer_id"],
+                "status": status,
+                "submission_file": None,
+                "submission_filename": f"task-{index + 1}.zip" if submitted else None,
+                "submission_date": created + timedelta(days=3) if submitted else None,
+                "review_comment": "Looks good" if status == "completed" else None,
+                "created_at": created,
+                "updated_at": created,
+            }
+
+    def project(self, buyer: dict):
+        created = self.moment(buyer["created_at"])
+        status = self.rng.choices(list(PROJECT_STATUSES), weights=list(PROJECT_STATUSES.values()))[0]
+        assigned = status in ("assigned", "in_progress", "completed")
+        minimum = 1 if assigned else 0
+        requested = self.rng.randint(minimum, max(minimum, self.args.requests_per_project))
+        solvers = self.rng.sample(self.solvers, min(requested, len(self.solvers)))
+        project = {
+            "_id": self.oid(),
+            "title": self.phrase(4).capitalize(),
+            "description": self.phrase(30),
+            "budget": float(self.rng.randrange(100, 20000, 50)),
+            "deadline": created + timedelta(days=self.rng.randint(14, 120)),
+            "requirements": self.rng.sample(SKILLS, 3),
+            "buyer_id": str(buyer["_id"]),
+            "status": status,
+            "assigned_solver_id": str(solvers[0]["_id"]) if assigned else None,
+            **party_fields("buyer", buyer),
+            **(party_fields("solver", solvers[0]) if assigned else {}),
+            "created_at": created,
+            "updated_at": created,
+        }
+        yield "projects", project
+
+        for index, solver in enumerate(solvers):
+            if assigned:
+                request_status = "accepted" if index == 0 else "rejected"
+            else:
+                request_status = "pending" if status == "open" else "rejected"
+            requested_at = self.moment(created)
+            request = {
+                "_id": self.oid(),
+                "project_id": str(project["_id"]),
+                "message": f"I have done {self.phrase(3)} before",
+                "solver_id": str(solver["_id"]),
+                "buyer_id": str(buyer["_id"]),
+                **party_fields("solver", solver),
+                **party_fields("buyer", buyer),
+                "status": request_status,
+                "created_at": requested_at,
+                "updated_at": requested_at,
+            }
+            yield "requests", request
+            if request_status == "accepted":
+                yield from self.plan(request, solver, "approved", status, buyer)
+            elif request_status == "pending" and self.rng.random() < 0.3:
+                yield from self.plan(request, solver, "pending", status, buyer)
+
+        if assigned:
+            yield from self.tasks(project, solvers[0])
+
+    def documents(self):
+        buyers = []
+        for collection, doc in self.users():
+            if doc["role"] == "buyer":
+                buyers.append(doc)
+            yield collection, doc
+        for buyer in buyers:
+            for _ in range(self.args.projects_per_buyer):
+                yield from self.project(buyer)
+
+
+async def main(args):
+    client, db = connect()
+    counts = Counter()
+    buffers: dict[str, list[dict]] = {}
+    start = time.perf_counter()
+
+    async def flush(collection: str):
+        if buffers.get(collection):
+            await db[collection].insert_many(buffers[collection], ordered=False)
+            counts[collection] += len(buffers[collection])
+            buffers[collection] = []
+
+    try:
+        await client.drop_database(db.name)
+        await ensure_indexes(db)
+        for collection, doc in Generator(args).documents():
+            buffers.setdefault(collection, []).append(doc)
+            if len(buffers[collection]) >= INSERT_BATCH:
+                await flush(collection)
+        for collection in list(buffers):
+            await flush(collection)
+    finally:
+        client.close()
+
+    elapsed = time.perf_counter() - start
+    for collection, count in counts.items():
+        print(f"{collection:<12} {count:>10}")
+    print(f"{sum(counts.values())} documents in {elapsed:.1f} s "
+          f"({sum(counts.values()) / elapsed:.0f}/s) into {db.name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--admins", type=int, default=2)
+    parser.add_argument("--buyers", type=int, default=200)
+    parser.add_argument("--solvers", type=int, default=800)
+    parser.add_argument("--projects-per-buyer", type=int, default=10)
+    parser.add_argument("--requests-per-project", type=int, default=5, help="at most; open projects may have none")
+    parser.add_argument("--milestones-per-plan", type=int, default=4, help="at most")
+    parser.add_argument("--tasks-per-project", type=int, default=6, help="at most, on assigned projects")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    if args.buyers and not args.solvers:
+        parser.error("projects need at least one solver")
+    asyncio.run(main(args))
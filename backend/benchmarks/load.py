@@ -0,0 +1,235 @@
+"""
+Load driver: role-realistic traffic against the API, in-process or over HTTP.
+
+Run benchmarks.generate first. Virtual users are split between solvers, buyers and
+admins (--mix). Each logs in with the generated password, discovers its own data
+through the API (a buyer's projects, their requests and plans; a solver's open and
+assigned projects) and then loops over weighted scenarios: listing, searching and
+opening projects, reading requests, tasks, plans and milestones, and occasionally
+posting a project or a request. Requests issued during --warmup are not counted.
+Latencies are grouped by method and route template and reported with
+benchmarks.report; --output saves the report as JSON for later comparison.
+
+--target asgi (the default) drives the app in-process through httpx's ASGI
+transport against the benchmark database; --target http://host:port drives a
+running server, which must be using the generated data.
+
+Usage: python -m benchmarks.load [--target asgi] [--concurrency 20] [--duration 30] [--output run.json]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, Optional
+import httpx
+from benchmarks.common import connect
+from benchmarks.generate import PASSWORD, WORDS
+from benchmarks.report import print_report, summarize
+
+USER_POOL = 200
+DISCOVERY_PAGE = 50
+
+
+class Session:
+    """One virtual user: its client, identity and the ids it discovered"""
+
+    def __init__(self, client: httpx.AsyncClient, role: str, email: str, rng: random.Random):
+        self.client = client
+        self.role = role
+        self.email = email
+        self.rng = rng
+        self.user_id: Optional[str] = None
+        self.projects: list[str] = []
+        self.assigned: list[str] = []
+        self.open: list[str] = []
+        self.requests: list[str] = []
+        self.plans: list[str] = []
+
+    async def login(self):
+        response = await self.client.post("/auth/login", data={"username": self.email, "password": PASSWORD})
+        response.raise_for_status()
+        self.client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+        self.user_id = (await self.client.get("/auth/me")).json()["id"]
+
+    async def items(self, url: str, **params) -> list[dict]:
+        response = await self.client.get(url, params={"limit": DISCOVERY_PAGE, **params})
+        response.raise_for_status()
+        return response.json()["items"]
+
+    async def discover(self):
+        if self.role == "buyer":
+            self.projects = [project["id"] for project in await self.items("/projects/")]
+            for project_id in self.projects[:5]:
+                for request in await self.items(f"/requests/project/{project_id}"):
+                    self.requests.append(request["id"])
+                    if request["status"] == "accepted":
+                        self.plans += [plan["id"] for plan in await self.items(f"/plans/request/{request['id']}")]
+        elif self.role == "problem_solver":
+            for project in await self.items("/projects/"):
+                if project["assigned_solver_id"] == self.user_id:
+                    self.assigned.append(project["id"])
+                elif project["status"] == "open":
+                    self.open.append(project["id"])
+
+    def pick(self, ids: list[str]) -> Optional[str]:
+        return self.rng.choice(ids) if ids else None
+
+    def term(self) -> str:
+        return self.rng.choice(WORDS)
+
+
+def _new_project(session: Session) -> dict:
+    return {
+        "title": f"Load test {session.term()} {session.term()}",
+        "description": " ".join(session.term() for _ in range(20)),
+        "budget": 1000.0,
+        "deadline": datetime(2030, 1, 1).isoformat(),
+        "requirements": ["python"],
+    }
+
+
+# (weight, "METHOD /route/template", build) where build(session) returns the URL and
+# request options, or None when the user has nothing to act on
+Scenario = tuple[int, str, Callable[[Session], Optional[tuple[str, dict]]]]
+
+
+def _on(ids_attr: str, template: str, **options) -> Callable[[Session], Optional[tuple[str, dict]]]:
+    """A request about one of the session's ids"""
+    def build(session: Session):
+        target = session.pick(getattr(session, ids_attr))
+        return (template.format(target), options) if target else None
+    return build
+
+
+def _new_request(session: Session) -> Optional[tuple[str, dict]]:
+    project_id = session.pick(session.open)
+    return ("/requests/", {"json": {"project_id": project_id, "message": "I can start this week"}}) if project_id else None
+
+
+SCENARIOS: dict[str, list[Scenario]] = {
+    "buyer": [
+        (25, "GET /projects/", lambda s: ("/projects/", {"params": {"limit": 20}})),
+        (15, "GET /projects/{project_id}", _on("projects", "/projects/{}")),
+        (15, "GET /requests/project/{project_id}", _on("projects", "/requests/project/{}", params={"limit": 20})),
+        (10, "GET /tasks/project/{project_id}", _on("projects", "/tasks/project/{}", params={"limit": 20})),
+        (5, "GET /plans/request/{request_id}", _on("requests", "/plans/request/{}")),
+        (5, "GET /plans/{plan_id}/milestones", _on("plans", "/plans/{}/milestones")),
+        (10, "GET /projects/search/", lambda s: ("/projects/search/", {"params": {"q": s.term(), "limit": 20}})),
+        (5, "GET /users/problem-solvers", lambda s: ("/users/problem-solvers", {"params": {"limit": 20}})),
+        (2, "POST /projects/", lambda s: ("/projects/", {"json": _new_project(s)})),
+    ],
+    "problem_solver": [
+        (25, "GET /projects/", lambda s: ("/projects/", {"params": {"limit": 20}})),
+        (20, "GET /projects/search/", lambda s: ("/projects/search/", {"params": {"q": s.term(), "limit": 20}})),
+        (15, "GET /projects/{project_id}", _on("open", "/projects/{}")),
+        (10, "GET /tasks/project/{project_id}", _on("assigned", "/tasks/project/{}", params={"limit": 20})),
+        (5, "GET /auth/me", lambda s: ("/auth/me", {})),
+        (3, "POST /requests/", _new_request),
+    ],
+    "admin": [
+        (30, "GET /users/", lambda s: ("/users/", {"params": {"limit": 50}})),
+        (25, "GET /users/search/", lambda s: ("/users/search/", {"params": {"q": s.term()[:3], "limit": 20}})),
+        (30, "GET /projects/", lambda s: ("/projects/", {"params": {"limit": 50}})),
+        (10, "GET /projects/search/", lambda s: ("/projects/search/", {"params": {"q": s.term(), "limit": 20}})),
+        (5, "GET /users/cache-stats", lambda s: ("/users/cache-stats", {})),
+    ],
+}
+
+
+async def run_user(session: Session, measure_from: float, deadline: float, samples: dict):
+    scenarios = SCENARIOS[session.role]
+    weights = [weight for weight, _, _ in scenarios]
+    while time.perf_counter() < deadline:
+        _, label, build = session.rng.choices(scenarios, weights=weights)[0]
+        built = build(session)
+        if built is None:
+            continue
+        url, options = built
+        start = time.perf_counter()
+        try:
+            status = (await session.client.request(label.split(" ", 1)[0], url, **options)).status_code
+        except httpx.TransportError:
+            status = 599  # Connection-level failure, reported with the 5xx
+        if start >= measure_from:
+            samples[label].append(((time.perf_counter() - start) * 1000, status))
+
+
+def open_target(target: str):
+    """(transport, base URL, Mongo client to close) for --target"""
+    if target != "asgi":
+        return None, target, None
+    from app import database
+    from app.main import app
+    mongo, db = connect()
+    database.client, database.database = mongo, db
+    # Unhandled errors become 500s, as they would over HTTP
+    return httpx.ASGITransport(app=app, raise_app_exceptions=False), "http://bench", mongo
+
+
+async def pool(admin: Session, role: str) -> list[str]:
+    users = await admin.items("/users/search/", role=role, limit=USER_POOL)
+    return [user["email"] for user in users]
+
+
+async def main(args) -> dict:
+    rng = random.Random(args.seed)
+    transport, base_url, mongo = open_target(args.target)
+
+    def client() -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60)
+
+    sessions: list[Session] = []
+    try:
+        admin = Session(client(), "admin", "admin0@bench.example.com", rng)
+        await admin.login()
+        emails = {role: await pool(admin, role) for role in ("buyer", "problem_solver", "admin")}
+        roles = list(args.mix)
+        for index in range(args.concurrency):
+            role = rng.choices(roles, weights=[args.mix[role] for role in roles])[0]
+            session = Session(client(), role, rng.choice(emails[role]), random.Random(args.seed + index))
+            # Logins hash passwords; done one at a time before the clock starts
+            await session.login()
+            await session.discover()
+            sessions.append(session)
+        await admin.client.aclose()
+
+        samples = defaultdict(list)
+        start = time.perf_counter()
+        measure_from = start + args.warmup
+        deadline = measure_from + args.duration
+        await asyncio.gather(*(run_user(session, measure_from, deadline, samples) for session in sessions))
+        duration = time.perf_counter() - measure_from
+    finally:
+        for session in sessions:
+            await session.client.aclose()
+        if mongo:
+            mongo.close()
+
+    meta = {"target": args.target, "concurrency": args.concurrency, "seed": args.seed,
+            "mix": args.mix, "started_at": datetime.utcnow().isoformat()}
+    return summarize(samples, duration, meta)
+
+
+def _mix(value: str) -> dict:
+    """problem_solver=60,buyer=30,admin=10"""
+    return {role: int(weight) for role, weight in (part.split("=") for part in value.split(","))}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target", default="asgi", help="asgi, or the base URL of a running server")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds before measuring")
+    parser.add_argument("--mix", type=_mix, default=_mix("problem_solver=60,buyer=30,admin=10"))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="save the report as JSON")
+    args = parser.parse_args()
+    report = asyncio.run(main(args))
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
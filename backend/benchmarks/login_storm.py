@@ -0,0 +1,68 @@
+"""
+Load test: latency of an unrelated endpoint during a login storm.
+
+Registers a throwaway user, measures GET /health latency at rest, then again while
+--concurrency clients log in continuously. With bcrypt off the event loop the two
+distributions should match; logins beyond the hashing queue get 503.
+
+Usage: python -m benchmarks.login_storm --base-url http://localhost:8000 [--concurrency 50] [--seconds 10]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from collections import Counter
+import httpx
+from benchmarks.common import percentile
+
+
+async def probe(client: httpx.AsyncClient, until: float) -> list[float]:
+    samples = []
+    while time.perf_counter() < until:
+        start = time.perf_counter()
+        await client.get("/health")
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.01)
+    return samples
+
+
+async def login_loop(client: httpx.AsyncClient, credentials: dict, until: float, statuses: Counter):
+    while time.perf_counter() < until:
+        response = await client.post("/auth/login", data=credentials)
+        statuses[response.status_code] += 1
+
+
+def summarize(label: str, samples: list[float]):
+    print(f"{label:<14} n={len(samples):<6} p50={percentile(samples, 50):7.1f} ms "
+          f"p95={percentile(samples, 95):7.1f} ms p99={percentile(samples, 99):7.1f} ms")
+
+
+async def main(base_url: str, concurrency: int, seconds: float):
+    credentials = {"username": f"storm-{uuid.uuid4().hex[:8]}@bench.example.com", "password": "storm-password"}
+    limits = httpx.Limits(max_connections=concurrency + 5)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        await client.post("/auth/register", json={
+            "email": credentials["username"],
+            "full_name": "Login Storm",
+            "password": credentials["password"],
+        })
+
+        baseline = await probe(client, time.perf_counter() + seconds)
+
+        statuses = Counter()
+        until = time.perf_counter() + seconds
+        storm = [login_loop(client, credentials, until, statuses) for _ in range(concurrency)]
+        results = await asyncio.gather(probe(client, until), *storm)
+
+    summarize("/health idle", baseline)
+    summarize("/health storm", results[0])
+    print("login statuses:", dict(statuses))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.concurrency, args.seconds))
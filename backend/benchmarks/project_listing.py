@@ -0,0 +1,123 @@
+"""
+Benchmark: project listing with per-row user lookups, a $lookup pipeline, and
+party details denormalized onto the projects (what the API serves).
+
+Seeds N projects (half open, half assigned) and reports Mongo round-trips and
+p99 latency of a full solver-feed listing for each strategy.
+
+Usage: python -m benchmarks.project_listing [--sizes 100 1000 10000] [--iterations 20]
+"""
+import argparse
+import asyncio
+from datetime import datetime
+from bson import ObjectId
+from benchmarks.common import CommandCounter, connect, percentile, timed
+from app.utils.party_details import party_fields
+
+# Joins buyer and solver details onto each project in the same round-trip. The ids
+# are stored as strings, so they are converted before the $lookup.
+PARTY_DETAILS_STAGES = [
+    {"$addFields": {
+        "_buyer_oid": {"$convert": {"input": "$buyer_id", "to": "objectId", "onError": None, "onNull": None}},
+        "_solver_oid": {"$convert": {"input": "$assigned_solver_id", "to": "objectId", "onError": None, "onNull": None}},
+    }},
+    {"$lookup": {"from": "users", "localField": "_buyer_oid", "foreignField": "_id", "as": "_buyer"}},
+    {"$lookup": {"from": "users", "localField": "_solver_oid", "foreignField": "_id", "as": "_solver"}},
+    {"$addFields": {
+        "buyer_email": {"$arrayElemAt": ["$_buyer.email", 0]},
+        "buyer_name": {"$arrayElemAt": ["$_buyer.full_name", 0]},
+        "solver_email": {"$arrayElemAt": ["$_solver.email", 0]},
+        "solver_name": {"$arrayElemAt": ["$_solver.full_name", 0]},
+    }},
+    {"$project": {"_buyer_oid": 0, "_solver_oid": 0, "_buyer": 0, "_solver": 0}},
+]
+
+
+async def seed(db, size: int):
+    await db.users.delete_many({})
+    await db.projects.delete_many({})
+    buyers = [ObjectId() for _ in range(50)]
+    solvers = [ObjectId() for _ in range(50)]
+    users = (
+        [{"_id": oid, "email": f"buyer{i}@bench.example.com", "full_name": f"Buyer {i}", "role": "buyer"}
+         for i, oid in enumerate(buyers)]
+        + [{"_id": oid, "email": f"solver{i}@bench.example.com", "full_name": f"Solver {i}", "role": "problem_solver"}
+           for i, oid in enumerate(solvers)]
+    )
+    await db.users.insert_many(users)
+    by_id = {user["_id"]: user for user in users}
+    now = datetime.utcnow()
+    await db.projects.insert_many([
+        {
+            **party_fields("buyer", by_id[buyers[i % len(buyers)]]),
+            **party_fields("solver", by_id[solvers[i % len(solvers)]] if i % 2 else None),
+            "title": f"Project {i}",
+            "description": "Benchmark project",
+            "requirements": [],
+            "buyer_id": str(buyers[i % len(buyers)]),
+            "assigned_solver_id": str(solvers[i % len(solvers)]) if i % 2 else None,
+            "status": "assigned" if i % 2 else "open",
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(size)
+    ])
+    return str(solvers[1])
+
+
+def solver_query(solver_id: str) -> dict:
+    return {"$or": [{"status": "open"}, {"assigned_solver_id": solver_id}]}
+
+
+async def list_per_row(db, solver_id: str):
+    """The previous implementation: one find plus up to two find_one per project"""
+    projects = []
+    async for project in db.projects.find(solver_query(solver_id)):
+        if project.get("buyer_id"):
+            buyer = await db.users.find_one({"_id": ObjectId(project["buyer_id"])})
+            if buyer:
+                project["buyer_email"] = buyer.get("email")
+                project["buyer_name"] = buyer.get("full_name")
+        if project.get("assigned_solver_id"):
+            solver = await db.users.find_one({"_id": ObjectId(project["assigned_solver_id"])})
+            if solver:
+                project["solver_email"] = solver.get("email")
+                project["solver_name"] = solver.get("full_name")
+        projects.append(project)
+    return projects
+
+
+async def list_pipeline(db, solver_id: str):
+    pipeline = [{"$match": solver_query(solver_id)}, *PARTY_DETAILS_STAGES]
+    return [project async for project in db.projects.aggregate(pipeline)]
+
+
+async def list_denormalized(db, solver_id: str):
+    return [project async for project in db.projects.find(solver_query(solver_id))]
+
+
+async def main(sizes: list[int], iterations: int):
+    counter = CommandCounter()
+    client, db = connect(counter)
+    print(f"{'projects':>9} {'strategy':>10} {'round-trips':>12} {'p99 ms':>10}")
+    try:
+        for size in sizes:
+            solver_id = await seed(db, size)
+            strategies = (("per-row", list_per_row), ("pipeline", list_pipeline), ("stored", list_denormalized))
+            for name, fn in strategies:
+                counter.reset()
+                await fn(db, solver_id)
+                round_trips = counter.count
+                samples = await timed(lambda: fn(db, solver_id), iterations)
+                print(f"{size:>9} {name:>10} {round_trips:>12} {percentile(samples, 99):>10.1f}")
+    finally:
+        await client.drop_database(db.name)
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.iterations))
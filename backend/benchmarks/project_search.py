@@ -0,0 +1,106 @@
+"""
+Benchmark: regex project search vs. the weighted $text search.
+
+Seeds a corpus of N projects (default 100k) built from a fixed vocabulary and
+compares p50/p99 latency and documents examined for both search modes, using the
+same pipelines as search_projects.
+
+Usage: python -m benchmarks.project_search [--size 100000] [--iterations 30]
+"""
+import argparse
+import asyncio
+import random
+import re
+from datetime import datetime, timedelta
+from benchmarks.common import connect, percentile, timed
+from app.indexes import ensure_indexes
+from app.utils.pagination import PAGE_SORT, PageParams, text_page_stages
+
+VOCABULARY = (
+    "api backend frontend dashboard mobile payment analytics migration scraper chatbot "
+    "react fastapi django mongodb postgres redis kubernetes terraform etl pipeline "
+    "invoice inventory booking marketplace crm report export import integration audit"
+).split()
+TERMS = ["dashboard", "payment", "kubernetes", "marketplace", "invoice"]
+
+
+def random_text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+async def seed(db, size: int):
+    await db.projects.drop()
+    rng = random.Random(42)
+    start = datetime.utcnow() - timedelta(days=365)
+    batch = []
+    for i in range(size):
+        batch.append({
+            "title": random_text(rng, 4),
+            "description": random_text(rng, 40),
+            "requirements": [random_text(rng, 2) for _ in range(3)],
+            "buyer_id": f"{i % 500:024x}",
+            "status": "open",
+            "created_at": start + timedelta(seconds=i),
+        })
+        if len(batch) == 10000:
+            await db.projects.insert_many(batch)
+            batch = []
+    if batch:
+        await db.projects.insert_many(batch)
+    await ensure_indexes(db)
+
+
+def page_params() -> PageParams:
+    return PageParams(limit=50, cursor=None)
+
+
+async def search_regex(db, term: str):
+    pattern = re.escape(term)
+    query = {"$or": [
+        {"title": {"$regex": pattern, "$options": "i"}},
+        {"description": {"$regex": pattern, "$options": "i"}},
+    ]}
+    return await db.projects.find(query).sort(PAGE_SORT).limit(51).to_list(length=None)
+
+
+async def search_text(db, term: str):
+    pipeline = text_page_stages({}, term, page_params())
+    return await db.projects.aggregate(pipeline).to_list(length=None)
+
+
+async def docs_examined(db, mode: str, term: str) -> int:
+    if mode == "regex":
+        pattern = re.escape(term)
+        command = {"find": "projects", "filter": {"$or": [
+            {"title": {"$regex": pattern, "$options": "i"}},
+            {"description": {"$regex": pattern, "$options": "i"}},
+        ]}, "sort": dict(PAGE_SORT), "limit": 51}
+    else:
+        command = {"aggregate": "projects", "pipeline": text_page_stages({}, term, page_params()), "cursor": {}}
+    explain = await db.command("explain", command, verbosity="executionStats")
+    stats = explain.get("executionStats") or explain["stages"][0]["$cursor"]["executionStats"]
+    return stats["totalDocsExamined"]
+
+
+async def main(size: int, iterations: int):
+    client, db = connect()
+    try:
+        await seed(db, size)
+        print(f"{'mode':>6} {'term':>12} {'docs examined':>14} {'p50 ms':>8} {'p99 ms':>8}")
+        for term in TERMS:
+            for mode, fn in (("regex", search_regex), ("text", search_text)):
+                samples = await timed(lambda: fn(db, term), iterations)
+                examined = await docs_examined(db, mode, term)
+                print(f"{mode:>6} {term:>12} {examined:>14} "
+                      f"{percentile(samples, 50):>8.1f} {percentile(samples, 99):>8.1f}")
+    finally:
+        await client.drop_database(db.name)
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--iterations", type=int, default=30)
+    args = parser.parse_args()
+    asyncio.run(main(args.size, args.iterations))
@@ -0,0 +1,229 @@
+"""
+Replay captured traffic against a seeded database at 1x, 5x or 10x speed.
+
+Reads the NDJSON files written by the traffic capture middleware (TRAFFIC_CAPTURE_DIR)
+and re-issues the reads on the original schedule divided by --speed, open-loop: a
+slow build does not slow the arrivals down. Captured ids are hashed, so they are
+mapped onto the benchmark database made by benchmarks.generate: each captured user
+becomes a generated user with the same role, and each captured id becomes a document
+of the matching collection, preferring ones that user owns. The mapping is stable,
+so a project polled a thousand times is still one project. Writes are skipped since
+bodies are never captured.
+
+The report matches benchmarks.load. To compare two builds, replay the same capture
+against each and pass the first report as --baseline, or use benchmarks.report later.
+
+Usage: python -m benchmarks.replay traffic/*.ndjson* [--target asgi] [--speed 5] [--output b.json] [--baseline a.json]
+"""
+import argparse
+import asyncio
+import heapq
+import json
+import random
+import re
+import time
+from collections import Counter, defaultdict
+from typing import Iterator, Optional
+import httpx
+from benchmarks.common import connect
+from benchmarks.generate import PASSWORD, WORDS
+from benchmarks.load import open_target
+from benchmarks.report import print_report, summarize
+
+REPLAYED_METHODS = {"GET", "HEAD"}
+REDACTED = "?"
+POOL_SIZE = 1000
+LATE_MS = 100
+
+ID_COLLECTIONS = {
+    "project_id": "projects",
+    "request_id": "requests",
+    "task_id": "tasks",
+    "plan_id": "plans",
+    "milestone_id": "milestones",
+    "user_id": "users",
+}
+# Field holding the owner of a document, per role; ids are mapped to owned documents first
+OWNER_FIELDS = {
+    "projects": {"buyer": "buyer_id", "problem_solver": "assigned_solver_id"},
+    "requests": {"buyer": "buyer_id", "problem_solver": "solver_id"},
+    "tasks": {"buyer": "buyer_id", "problem_solver": "solver_id"},
+    "plans": {"problem_solver": "solver_id"},
+}
+PATH_PARAM = re.compile(r"{(\w+)(?::\w+)?}")
+
+
+def read_capture(path: str) -> Iterator[dict]:
+    with open(path) as capture:
+        for line in capture:
+            if line.strip():
+                yield json.loads(line)
+
+
+def records(paths: list[str]) -> Iterator[dict]:
+    """All captured records in time order. Each file is written as requests finish, so it
+    is only nearly ordered by start time; stragglers are sent as soon as they are read."""
+    return heapq.merge(*(read_capture(path) for path in paths), key=lambda record: record["ts"])
+
+
+class IdMapper:
+    """Stable mapping of captured users and ids onto the generated data"""
+
+    def __init__(self, db, rng: random.Random):
+        self.db = db
+        self.rng = rng
+        self.users: dict[str, dict] = {}
+        self.ids: dict[tuple, str] = {}
+        self.pools: dict[tuple, list[str]] = {}
+
+    async def map_users(self, captured: dict[str, str]):
+        """captured user -> role; distinct captured users stay distinct while the pool lasts"""
+        by_role = defaultdict(list)
+        for user, role in sorted(captured.items()):
+            by_role[role].append(user)
+        for role, users in by_role.items():
+            pool = await self.db.users.find({"role": role}, {"email": 1}).sort("_id", 1).to_list(length=POOL_SIZE)
+            if not pool:
+                raise SystemExit(f"No generated {role} users; run benchmarks.generate first")
+            self.rng.shuffle(pool)
+            for index, user in enumerate(users):
+                self.users[user] = {**pool[index % len(pool)], "role": role}
+
+    async def _pool(self, collection: str, user: Optional[dict]) -> list[str]:
+        owner_field = OWNER_FIELDS.get(collection, {}).get(user["role"]) if user else None
+        key = (collection, str(user["_id"]) if owner_field else None)
+        if key not in self.pools:
+            query = {owner_field: str(user["_id"])} if owner_field else {}
+            docs = await self.db[collection].find(query, {"_id": 1}).sort("_id", 1).to_list(length=POOL_SIZE)
+            if not docs and owner_field:
+                return await self._pool(collection, None)
+            self.pools[key] = [str(doc["_id"]) for doc in docs]
+        return self.pools[key]
+
+    async def map_id(self, name: str, captured: str, user: Optional[dict]) -> Optional[str]:
+        collection = ID_COLLECTIONS.get(name)
+        if collection is None or captured == REDACTED:
+            return None
+        key = (name, captured, str(user["_id"]) if user else None)
+        if key not in self.ids:
+            pool = await self._pool(collection, user)
+            if not pool:
+                return None
+            self.ids[key] = self.rng.choice(pool)
+        return self.ids[key]
+
+    async def url(self, record: dict, user: Optional[dict]) -> Optional[tuple[str, dict]]:
+        values = {}
+        for name, captured in record["params"].items():
+            mapped = await self.map_id(name, captured, user)
+            if mapped is None:
+                return None
+            values[name] = mapped
+        path = PATH_PARAM.sub(lambda match: values[match.group(1)], record["route"])
+        params = {}
+        for name, value in record["query"].items():
+            if value != REDACTED:
+                params[name] = value
+            elif name == "q":
+                params[name] = self.rng.choice(WORDS)
+            # Other redacted values (cursors) are dropped: the first page is replayed
+        return path, params
+
+
+async def login(client: httpx.AsyncClient, email: str) -> str:
+    response = await client.post("/auth/login", data={"username": email, "password": PASSWORD})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def main(args) -> dict:
+    captured_users, skipped = {}, Counter()
+    first_ts = None
+    for record in records(args.capture):
+        first_ts = record["ts"] if first_ts is None else first_ts
+        if record["user"]:
+            captured_users[record["user"]] = record["role"]
+
+    rng = random.Random(args.seed)
+    transport, base_url, target_mongo = open_target(args.target)
+    mongo, db = connect()
+    mapper = IdMapper(db, rng)
+    samples = defaultdict(list)
+    late = 0
+    client = httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60,
+                               limits=httpx.Limits(max_connections=args.max_in_flight))
+    try:
+        await mapper.map_users(captured_users)
+        # Logins hash passwords; done before the clock starts
+        tokens = {}
+        for user in mapper.users.values():
+            if user["email"] not in tokens:
+                tokens[user["email"]] = await login(client, user["email"])
+
+        in_flight = asyncio.Semaphore(args.max_in_flight)
+        tasks = set()
+
+        async def send(label: str, method: str, url: str, params: dict, headers: dict):
+            async with in_flight:
+                sent = time.perf_counter()
+                try:
+                    status = (await client.request(method, url, params=params, headers=headers)).status_code
+                except httpx.TransportError:
+                    status = 599  # Connection-level failure, reported with the 5xx
+                samples[label].append(((time.perf_counter() - sent) * 1000, status))
+
+        start = time.perf_counter()
+        for record in records(args.capture):
+            if record["method"] not in REPLAYED_METHODS:
+                skipped["write"] += 1
+                continue
+            user = mapper.users.get(record["user"])
+            built = await mapper.url(record, user)
+            if built is None:
+                skipped["unmappable"] += 1
+                continue
+            due = start + (record["ts"] - first_ts) / args.speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            elif -delay * 1000 > LATE_MS:
+                late += 1
+            headers = {"Authorization": f"Bearer {tokens[user['email']]}"} if user else {}
+            task = asyncio.create_task(send(f"{record['method']} {record['route']}", record["method"],
+                                            built[0], built[1], headers))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks)
+        duration = time.perf_counter() - start
+    finally:
+        await client.aclose()
+        mongo.close()
+        if target_mongo:
+            target_mongo.close()
+
+    print(f"Skipped {skipped['write']} writes and {skipped['unmappable']} unmappable requests; "
+          f"{late} requests sent more than {LATE_MS} ms late")
+    meta = {"target": args.target, "concurrency": f"{len(mapper.users)} captured", "seed": args.seed,
+            "speed": args.speed, "capture": args.capture}
+    return summarize(samples, duration, meta)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("capture", nargs="+", help="capture files (traffic-<pid>.ndjson and rotated .1, .2, ...)")
+    parser.add_argument("--target", default="asgi", help="asgi, or the base URL of a running server")
+    parser.add_argument("--speed", type=float, default=1.0, help="1 replays in real time, 5 five times faster")
+    parser.add_argument("--max-in-flight", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="save the report as JSON")
+    parser.add_argument("--baseline", help="an earlier report to compare with")
+    args = parser.parse_args()
+    report = asyncio.run(main(args))
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
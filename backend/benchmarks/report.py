@@ -0,0 +1,71 @@
+"""
+Latency and throughput report for a load run.
+
+summarize() turns the driver's samples into p50/p95/p99/max latency, requests per
+second and 4xx/5xx counts per endpoint (method and route template) plus a total
+row; the result is what benchmarks.load prints and saves with --output. Run as a
+script to print a saved report, optionally against a baseline to compare runs.
+
+Usage: python -m benchmarks.report results.json [--baseline before.json]
+"""
+import argparse
+import json
+from typing import Optional
+from benchmarks.common import percentile
+
+TOTAL = "TOTAL"
+
+
+def _row(samples: list[tuple[float, int]], duration: float) -> dict:
+    latencies = [ms for ms, _ in samples]
+    return {
+        "count": len(samples),
+        "rps": len(samples) / duration if duration else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": max(latencies, default=0.0),
+        "errors_4xx": sum(1 for _, status in samples if 400 <= status < 500),
+        "errors_5xx": sum(1 for _, status in samples if status >= 500),
+    }
+
+
+def summarize(samples: dict[str, list[tuple[float, int]]], duration: float, meta: dict) -> dict:
+    """samples: endpoint label -> [(latency ms, status code)] collected over `duration` seconds"""
+    endpoints = {label: _row(rows, duration) for label, rows in sorted(samples.items())}
+    endpoints[TOTAL] = _row([row for rows in samples.values() for row in rows], duration)
+    return {"meta": {**meta, "duration_seconds": duration}, "endpoints": endpoints}
+
+
+def _delta(value: float, before: Optional[float]) -> str:
+    if not before:
+        return ""
+    return f" ({(value - before) / before:+.0%})"
+
+
+def print_report(report: dict, baseline: Optional[dict] = None):
+    meta = report["meta"]
+    print(f"\n{meta.get('target')}: {meta.get('concurrency')} users for {meta['duration_seconds']:.0f} s "
+          f"(seed {meta.get('seed')})")
+    print(f"{'endpoint':<40} {'count':>7} {'rps':>8} {'p50 ms':>8} {'p95 ms':>16} {'p99 ms':>9} "
+          f"{'max ms':>9} {'4xx':>5} {'5xx':>5}")
+    before_rows = (baseline or {}).get("endpoints", {})
+    for label, row in report["endpoints"].items():
+        before = before_rows.get(label, {})
+        p95 = f"{row['p95']:.1f}{_delta(row['p95'], before.get('p95'))}"
+        print(f"{label:<40} {row['count']:>7} {row['rps']:>8.1f} {row['p50']:>8.1f} {p95:>16} "
+              f"{row['p99']:>9.1f} {row['max']:>9.1f} {row['errors_4xx']:>5} {row['errors_5xx']:>5}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("report")
+    parser.add_argument("--baseline", help="an earlier report; p95 changes are shown next to each endpoint")
+    args = parser.parse_args()
+    with open(args.report) as f:
+        report = json.load(f)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
@@ -0,0 +1,82 @@
+"""
+Benchmark: Mongo commands behind one page of GET /requests/project/{id}.
+
+Seeds a project with N requests from N/2 distinct solvers (so ids repeat), lists it
+through the app in-process and reports the commands sent per collection. Solver
+details come from the request-scoped UserLoader, so the users collection must be
+queried at most once per page whatever its size; exits non-zero otherwise.
+
+Usage: python -m benchmarks.request_listing [--sizes 10 50 200]
+"""
+import argparse
+import asyncio
+import sys
+from datetime import datetime
+from bson import ObjectId
+import httpx
+from benchmarks.common import CommandCounter, connect
+from app import database
+from app.utils.auth import create_access_token
+from app.main import app
+
+
+async def seed(db, size: int) -> str:
+    await db.users.delete_many({})
+    await db.requests.delete_many({})
+    solvers = [ObjectId() for _ in range(max(1, size // 2))]
+    await db.users.insert_many(
+        [{"email": "admin@bench.example.com", "full_name": "Admin", "role": "admin",
+          "created_at": datetime.utcnow(), "updated_at": datetime.utcnow()}]
+        + [{"_id": oid, "email": f"solver{i}@bench.example.com", "full_name": f"Solver {i}", "role": "problem_solver"}
+           for i, oid in enumerate(solvers)]
+    )
+    project_id = str(ObjectId())
+    now = datetime.utcnow()
+    await db.requests.insert_many([
+        {
+            "project_id": project_id,
+            "solver_id": str(solvers[i % len(solvers)]),
+            "message": None,
+            "status": "pending",
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(size)
+    ])
+    return project_id
+
+
+async def main(sizes: list[int]) -> bool:
+    counter = CommandCounter()
+    client, db = connect(counter)
+    # Route the app's queries through the counting client
+    database.client, database.database = client, db
+    token = create_access_token({"sub": "admin@bench.example.com"})
+    ok = True
+    print(f"{'requests':>9} {'commands':>9} {'users finds':>12}")
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench",
+                                     headers={"Authorization": f"Bearer {token}"}) as http:
+            for size in sizes:
+                project_id = await seed(db, size)
+                # Warm the principal cache so only the listing itself is counted
+                await http.get(f"/requests/project/{project_id}", params={"limit": 1})
+                counter.reset()
+                response = await http.get(f"/requests/project/{project_id}", params={"limit": size})
+                response.raise_for_status()
+                user_finds = counter.by_collection[("find", "users")]
+                ok = ok and user_finds <= 1
+                print(f"{len(response.json()['items']):>9} {counter.count:>9} {user_finds:>12}")
+    finally:
+        await client.drop_database(db.name)
+        client.close()
+    print("PASS: O(1) user queries per page" if ok else "FAIL")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200])
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(main(args.sizes)) else 1)
@@ -0,0 +1,126 @@
+"""
+Benchmark: serializing a page of each response model, validated vs. trusted.
+
+For every model served by a list endpoint (User, Project, Request, Task, Plan,
+Milestone) it builds N representative documents and times:
+
+  validated  Model(**doc) per item, FastAPI's serialize_response against
+             Page[Model] (the second validation), then the stdlib JSON encoder
+  orjson     the same validation, encoded by FastJSONResponse
+  trusted    trusted_page: project onto the model's fields, encode with orjson
+
+and checks that the trusted bytes decode to the same JSON as the validated path.
+No database is needed.
+
+Usage: python -m benchmarks.serialization [--items 5000] [--repeat 5]
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from bson import ObjectId
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from starlette.responses import JSONResponse
+import benchmarks.common  # noqa: F401  (settings for app imports)
+from app.models.page import Page
+from app.models.user import User
+from app.models.project import Project
+from app.models.request import Request
+from app.models.task import Task
+from app.models.plan import Plan, Milestone
+from app.utils.responses import FastJSONResponse, trusted_page
+
+
+def _base(i: int) -> dict:
+    now = datetime(2024, 1, 1) + timedelta(seconds=i, milliseconds=i % 1000)
+    return {"_id": ObjectId(), "created_at": now, "updated_at": now}
+
+
+SAMPLES = {
+    User: lambda i: {
+        **_base(i), "email": f"user{i}@bench.example.com", "full_name": f"User {i}",
+        "role": "problem_solver", "profile": {"bio": "Benchmark user", "skills": ["python", "mongodb"]},
+    },
+    Project: lambda i: {
+        **_base(i), "title": f"Project {i}", "description": "Benchmark project " * 10,
+        "budget": 1500.0, "deadline": datetime(2025, 1, 1), "requirements": ["python", "fastapi"],
+        "buyer_id": str(ObjectId()), "assigned_solver_id": str(ObjectId()), "status": "assigned",
+        "buyer_email": "buyer@bench.example.com", "buyer_name": "Buyer", "solver_email": "solver@bench.example.com",
+        "solver_name": "Solver",
+    },
+    Request: lambda i: {
+        **_base(i), "project_id": str(ObjectId()), "message": "I can do this", "solver_id": str(ObjectId()),
+        "buyer_id": str(ObjectId()), "status": "pending", "solver_email": "solver@bench.example.com",
+        "solver_name": "Solver",
+    },
+    Task: lambda i: {
+        **_base(i), "title": f"Task {i}", "description": "Benchmark task", "project_id": str(ObjectId()),
+        "solver_id": str(ObjectId()), "buyer_id": str(ObjectId()), "status": "submitted",
+        "submission_file": "uploads/blobs/ab/abcdef.zip", "submission_filename": "work.zip",
+        "submission_size": 123456, "submission_sha256": "ab" * 32,
+        "submission_manifest": {"status": "ok", "entry_count": 12, "total_size": 654321},
+        "submission_date": datetime(2024, 6, 1),
+    },
+    Plan: lambda i: {
+        **_base(i), "request_id": str(ObjectId()), "title": f"Plan {i}", "description": "Benchmark plan",
+        "estimated_days": 10, "solver_id": str(ObjectId()), "status": "approved", "progress_percentage": 50.0,
+        "milestones_total": 2, "milestones_completed": 1,
+        "milestones": [{"title": "M1", "description": "First", "deadline": None, "estimated_hours": 4.0},
+                       {"title": "M2", "description": "Second", "deadline": None, "estimated_hours": 6.0}],
+    },
+    Milestone: lambda i: {
+        **_base(i), "title": f"Milestone {i}", "description": "Benchmark milestone", "plan_id": str(ObjectId()),
+        "status": "in_progress", "estimated_hours": 3.0,
+    },
+}
+
+
+def documents(model, size: int) -> list[dict]:
+    docs = [SAMPLES[model](i) for i in range(size)]
+    for doc in docs:
+        doc["id"] = str(doc.pop("_id"))
+    return docs
+
+
+async def validated(model, field, docs: list[dict], response_class) -> bytes:
+    page = Page(items=[model(**dict(doc)) for doc in docs], next_cursor=None)
+    content = await serialize_response(field=field, response_content=page)
+    return response_class(content).body
+
+
+def best_of(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main(size: int, repeat: int):
+    loop = asyncio.new_event_loop()
+    print(f"{size} items per page, best of {repeat}")
+    print(f"{'model':<10} {'validated ms':>13} {'orjson ms':>10} {'trusted ms':>11} {'speed-up':>9} {'same':>5}")
+    for model in SAMPLES:
+        docs = documents(model, size)
+        field = create_model_field(name="Response", type_=Page[model], mode="serialization")
+        runs = {
+            "validated": lambda: loop.run_until_complete(validated(model, field, docs, JSONResponse)),
+            "orjson": lambda: loop.run_until_complete(validated(model, field, docs, FastJSONResponse)),
+            "trusted": lambda: trusted_page(model, docs, None).body,
+        }
+        same = json.loads(runs["validated"]()) == json.loads(runs["trusted"]())
+        ms = {name: best_of(fn, repeat) for name, fn in runs.items()}
+        print(f"{model.__name__:<10} {ms['validated']:>13.1f} {ms['orjson']:>10.1f} {ms['trusted']:>11.1f} "
+              f"{ms['validated'] / ms['trusted']:>8.1f}x {'yes' if same else 'NO':>5}")
+    loop.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.items, args.repeat)
@@ -0,0 +1,55 @@
+"""
+Consistency check: compares the buyer/solver details denormalized onto projects and
+requests with the users they reference and reports every drifted copy.
+Pass --repair to overwrite the drifted copies with the current user details.
+"""
+import asyncio
+import os
+import sys
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+import certifi
+
+load_dotenv()
+
+from app.utils.party_details import find_drift, repair_drift
+
+
+async def main(repair: bool) -> int:
+    mongodb_url = os.getenv("MONGODB_URL")
+    database_name = os.getenv("DATABASE_NAME", "marketplace")
+
+    client = AsyncIOMotorClient(
+        mongodb_url,
+        tlsCAFile=certifi.where(),
+        serverSelectionTimeoutMS=5000,
+        connectTimeoutMS=10000,
+        socketTimeoutMS=20000,
+    )
+    db = client[database_name]
+
+    drift = await find_drift(db)
+    for entry in drift:
+        stored, expected = entry["stored"], entry["expected"]
+        print(f"[drift] {entry['collection']}/{entry['_id']} {entry['prefix']}: "
+              f"{stored['full_name']} <{stored['email']}> -> {expected['full_name']} <{expected['email']}>")
+
+    if not drift:
+        client.close()
+        print("\n✅ Every denormalized copy matches its user")
+        return 0
+
+    if repair:
+        modified = await repair_drift(db, drift)
+        client.close()
+        print(f"\n✅ Repaired {modified} document(s)")
+        return 0
+
+    client.close()
+    print(f"\n❌ {len(drift)} drifted copies; run with --repair to fix them")
+    return 1
+
+
+if __name__ == "__main__":
+    print("=== Party Details Consistency ===")
+    sys.exit(asyncio.run(main("--repair" in sys.argv)))
@@ -0,0 +1,50 @@
+"""
+Minimal static file server for signed download URLs.
+
+Stands in for nginx/a CDN when DOWNLOAD_MODE=signed_url: it serves files from
+UPLOAD_DIR only when the URL carries a valid, unexpired HMAC signature issued by
+the API, with Range and conditional request support. The download is named after
+the signed filename parameter.
+
+Run: uvicorn file_server:app --port 8001
+"""
+import os
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from app.config import settings
+from app.utils.downloads import file_download_response, verify_download_signature
+
+
+async def serve_file(request: Request):
+    relative_path = request.path_params["path"]
+    try:
+        expires = int(request.query_params.get("expires", ""))
+    except ValueError:
+        return PlainTextResponse("Invalid download link", status_code=403)
+    filename = request.query_params.get("filename", "")
+    signature = request.query_params.get("signature", "")
+    if not verify_download_signature(relative_path, filename, expires, signature):
+        return PlainTextResponse("Invalid or expired download link", status_code=403)
+
+    root = os.path.realpath(settings.upload_dir)
+    path = os.path.realpath(os.path.join(root, relative_path))
+    if not path.startswith(root + os.sep) or not os.path.isfile(path):
+        return PlainTextResponse("File not found", status_code=404)
+
+    # Blobs are named by their hash; the signed filename is the submission's original name
+    return await file_download_response(request, path, filename or os.path.basename(path), "application/zip")
+
+
+app = Starlette(
+    routes=[Route("/files/{path:path}", serve_file)],
+    middleware=[Middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_headers=["Range", "If-Range", "If-None-Match", "If-Modified-Since"],
+        expose_headers=["Content-Disposition", "Content-Range", "Accept-Ranges", "ETag"],
+    )],
+)
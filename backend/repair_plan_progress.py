@@ -0,0 +1,37 @@
+"""
+Repair job: rebuilds every plan's milestones_total / milestones_completed counters
+and progress_percentage from the milestones collection.
+Safe to run at any time; run it after manual edits to milestones.
+"""
+import asyncio
+import os
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+import certifi
+
+load_dotenv()
+
+from app.utils.plan_progress import rebuild_plan_counters
+
+
+async def repair():
+    mongodb_url = os.getenv("MONGODB_URL")
+    database_name = os.getenv("DATABASE_NAME", "marketplace")
+
+    client = AsyncIOMotorClient(
+        mongodb_url,
+        tlsCAFile=certifi.where(),
+        serverSelectionTimeoutMS=5000,
+        connectTimeoutMS=10000,
+        socketTimeoutMS=20000,
+    )
+    db = client[database_name]
+
+    updated = await rebuild_plan_counters(db)
+    print(f"✅ Rebuilt progress counters, {updated} plan(s) corrected")
+
+    client.close()
+
+if __name__ == "__main__":
+    print("=== Repair Plan Progress ===")
+    asyncio.run(repair())
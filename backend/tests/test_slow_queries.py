@@ -0,0 +1,61 @@
+import os
+import unittest
+from datetime import datetime
+from bson import ObjectId
+
+os.environ.setdefault("MONGODB_URL", "mongodb://localhost:27017")
+os.environ.setdefault("SECRET_KEY", "test")
+
+from app.utils.slow_queries import REDACTED, command_shape
+
+
+def milestone(index: int) -> dict:
+    return {
+        "_id": ObjectId(),
+        "plan_id": "000000000000000000000000",
+        "title": f"Milestone {index}",
+        "status": "pending",
+        "deadline": datetime(2030, 1, 1),
+        "notes": None if index % 2 else "secret",
+    }
+
+
+class CommandShapeTest(unittest.TestCase):
+    def test_insert_collapses_documents(self):
+        command = {"insert": "milestones", "ordered": True, "documents": [milestone(i) for i in range(500)],
+                   "lsid": {"id": "session"}}
+        shape = command_shape("insert", command)
+        self.assertEqual(shape["insert"], "milestones")
+        self.assertNotIn("lsid", shape)
+        self.assertEqual(shape["documents"]["$count"], 500)
+        self.assertEqual(shape["documents"]["$first"]["title"], REDACTED)
+        self.assertNotIn("secret", repr(shape))
+
+    def test_bulk_updates_collapse(self):
+        updates = [{"q": {"_id": ObjectId()}, "u": {"$set": {"milestones_total": i}}} for i in range(100)]
+        shape = command_shape("update", {"update": "plans", "updates": updates})
+        self.assertEqual(shape["updates"], {
+            "$first": {"q": {"_id": REDACTED}, "u": {"$set": {"milestones_total": REDACTED}}},
+            "$count": 100,
+        })
+
+    def test_in_of_subdocuments_collapses(self):
+        values = [{"plan_id": str(i), "status": "pending"} for i in range(50)]
+        shape = command_shape("find", {"find": "milestones", "filter": {"pair": {"$in": values}}})
+        self.assertEqual(shape["filter"]["pair"]["$in"]["$count"], 50)
+
+    def test_pipeline_stages_are_kept(self):
+        pipeline = [
+            {"$match": {"plan_id": "abc"}},
+            {"$project": {"label": {"$literal": "secret"}, "status": 1}},
+            {"$limit": 5},
+        ]
+        shape = command_shape("aggregate", {"aggregate": "milestones", "pipeline": pipeline, "cursor": {}})
+        self.assertEqual(len(shape["pipeline"]), 3)
+        self.assertEqual(shape["pipeline"][0], {"$match": {"plan_id": REDACTED}})
+        self.assertEqual(shape["pipeline"][2], {"$limit": 5})
+        self.assertNotIn("secret", repr(shape))
+
+
+if __name__ == "__main__":
+    unittest.main()
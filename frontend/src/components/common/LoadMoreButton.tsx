@@ -0,0 +1,39 @@
+"use client";
+
+import { useState } from "react";
+import { motion } from "framer-motion";
+
+interface LoadMoreButtonProps {
+  onLoadMore: () => Promise<void>;
+  className?: string;
+}
+
+export default function LoadMoreButton({
+  onLoadMore,
+  className = "",
+}: LoadMoreButtonProps) {
+  const [loading, setLoading] = useState(false);
+
+  const handleClick = async () => {
+    setLoading(true);
+    try {
+      await onLoadMore();
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  return (
+    <div className={`flex justify-center ${className}`}>
+      <motion.button
+        whileHover={{ scale: 1.05 }}
+        whileTap={{ scale: 0.95 }}
+        onClick={handleClick}
+        disabled={loading}
+        className="btn-secondary disabled:opacity-50"
+      >
+        {loading ? "Loading..." : "Load more"}
+      </motion.button>
+    </div>
+  );
+}
@@ -3,17 +3,20 @@
 import { useEffect, useState } from "react";
 import { motion } from "framer-motion";
 import { Users, FolderKanban } from "lucide-react";
-import api from "@/lib/api";
+import api, { fetchPage } from "@/lib/api";
 import { User, Project } from "@/types";
 import ProjectDetailsModal from "@/components/modals/ProjectDetailsModal";
 import ProjectManagementModal from "@/components/modals/ProjectManagementModal";
 import SearchBar from "@/components/common/SearchBar";
+import LoadMoreButton from "@/components/common/LoadMoreButton";
 
 export default function AdminDashboard() {
   const [users, setUsers] = useState<User[]>([]);
   const [projects, setProjects] = useState<Project[]>([]);
-  const [filteredUsers, setFilteredUsers] = useState<User[]>([]);
-  const [filteredProjects, setFilteredProjects] = useState<Project[]>([]);
+  const [usersCursor, setUsersCursor] = useState<string | null>(null);
+  const [projectsCursor, setProjectsCursor] = useState<string | null>(null);
+  const [userQuery, setUserQuery] = useState("");
+  const [projectQuery, setProjectQuery] = useState("");
   const [loading, setLoading] = useState(true);
   const [selectedProject, setSelectedProject] = useState<Project | null>(null);
   const [showProjectDetailsModal, setShowProjectDetailsModal] = useState(false);
@@ -25,14 +28,14 @@ export default function AdminDashboard() {
 
   const fetchData = async () => {
     try {
-      const [usersRes, projectsRes] = await Promise.all([
-        api.get("/users/"),
-        api.get("/projects/"),
+      const [usersPage, projectsPage] = await Promise.all([
+        fetchPage<User>("/users/"),
+        fetchPage<Project>("/projects/"),
       ]);
-      setUsers(usersRes.data);
-      setProjects(projectsRes.data);
-      setFilteredUsers(usersRes.data);
-      setFilteredProjects(projectsRes.data);
+      setUsers(usersPage.items);
+      setUsersCursor(usersPage.next_cursor);
+      setProjects(projectsPage.items);
+      setProjectsCursor(projectsPage.next_cursor);
     } catch (error) {
       console.error("Failed to fetch data:", error);
     } finally {
@@ -40,32 +43,45 @@ export default function AdminDashboard() {
     }
   };
 
-  const handleUserSearch = (query: string) => {
-    if (!query.trim()) {
-      setFilteredUsers(users);
-    } else {
-      const filtered = users.filter(
-        (user) =>
-          user.full_name.toLowerCase().includes(query.toLowerCase()) ||
-          user.email.toLowerCase().includes(query.toLowerCase()),
-      );
-      setFilteredUsers(filtered);
+  const loadMoreUsers = async () => {
+    try {
+      const page = await fetchPage<User>("/users/", usersCursor);
+      setUsers((current) => [...current, ...page.items]);
+      setUsersCursor(page.next_cursor);
+    } catch (error) {
+      console.error("Failed to fetch users:", error);
     }
   };
 
-  const handleProjectSearch = (query: string) => {
-    if (!query.trim()) {
-      setFilteredProjects(projects);
-    } else {
-      const filtered = projects.filter(
-        (project) =>
-          project.title.toLowerCase().includes(query.toLowerCase()) ||
-          project.description.toLowerCase().includes(query.toLowerCase()),
-      );
-      setFilteredProjects(filtered);
+  const loadMoreProjects = async () => {
+    try {
+      const page = await fetchPage<Project>("/projects/", projectsCursor);
+      setProjects((current) => [...current, ...page.items]);
+      setProjectsCursor(page.next_cursor);
+    } catch (error) {
+      console.error("Failed to fetch projects:", error);
     }
   };
 
+  // Searches filter the pages loaded so far
+  const filteredUsers = userQuery.trim()
+    ? users.filter(
+        (user) =>
+          user.full_name.toLowerCase().includes(userQuery.toLowerCase()) ||
+          user.email.toLowerCase().includes(userQuery.toLowerCase()),
+      )
+    : users;
+
+  const filteredProjects = projectQuery.trim()
+    ? projects.filter(
+        (project) =>
+          project.title.toLowerCase().includes(projectQuery.toLowerCase()) ||
+          project.description
+            .toLowerCase()
+            .includes(projectQuery.toLowerCase()),
+      )
+    : projects;
+
   const handleRoleChange = async (userId: string, newRole: string) => {
     try {
       await api.patch(`/users/${userId}/role`, { role: newRole });
@@ -103,7 +119,10 @@ export default function AdminDashboard() {
           <div className="flex items-center justify-between">
             <div>
               <p className="text-gray-600 text-sm">Total Users</p>
-              <p className="text-3xl font-bold text-gray-800">{users.length}</p>
+              <p className="text-3xl font-bold text-gray-800">
+                {users.length}
+                {usersCursor && "+"}
+              </p>
             </div>
             <Users className="w-12 h-12 text-primary-600" />
           </div>
@@ -120,6 +139,7 @@ export default function AdminDashboard() {
               <p className="text-gray-600 text-sm">Total Projects</p>
               <p className="text-3xl font-bold text-gray-800">
                 {projects.length}
+                {projectsCursor && "+"}
               </p>
             </div>
             <FolderKanban className="w-12 h-12 text-primary-600" />
@@ -140,7 +160,7 @@ export default function AdminDashboard() {
         <div className="mb-4">
           <SearchBar
             placeholder="Search users by name or email..."
-            onSearch={handleUserSearch}
+            onSearch={setUserQuery}
           />
         </div>
         <div className="overflow-x-auto">
@@ -207,6 +227,9 @@ export default function AdminDashboard() {
             </tbody>
           </table>
         </div>
+        {usersCursor && (
+          <LoadMoreButton onLoadMore={loadMoreUsers} className="mt-4" />
+        )}
       </motion.div>
 
       {/* Projects */}
@@ -222,7 +245,7 @@ export default function AdminDashboard() {
           </h2>
           <SearchBar
             placeholder="Search projects by title or description..."
-            onSearch={handleProjectSearch}
+            onSearch={setProjectQuery}
             className="max-w-2xl"
           />
           <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
@@ -269,6 +292,7 @@ export default function AdminDashboard() {
               </motion.div>
             ))}
           </div>
+          {projectsCursor && <LoadMoreButton onLoadMore={loadMoreProjects} />}
         </motion.div>
       )}
 
@@ -3,7 +3,7 @@
 import { useEffect, useState } from "react";
 import { motion, AnimatePresence } from "framer-motion";
 import { Plus, FolderKanban, Users, CheckCircle } from "lucide-react";
-import api from "@/lib/api";
+import api, { fetchAllPages, fetchPage } from "@/lib/api";
 import { Project, Request, Task } from "@/types";
 import CreateProjectModal from "@/components/modals/CreateProjectModal";
 import ProjectCard from "@/components/cards/ProjectCard";
@@ -14,6 +14,7 @@ import ProjectManagementModal from "@/components/modals/ProjectManagementModal";
 import PlanApprovalModal from "@/components/modals/PlanApprovalModal";
 import TaskDownloadModal from "@/components/modals/TaskDownloadModal";
 import SearchBar from "@/components/common/SearchBar";
+import LoadMoreButton from "@/components/common/LoadMoreButton";
 import { useToastStore } from "@/store/toastStore";
 import { useAuthStore } from "@/store/authStore";
 
@@ -21,6 +22,8 @@ export default function BuyerDashboard() {
   const { addToast } = useToastStore();
   const { user } = useAuthStore();
   const [projects, setProjects] = useState<Project[]>([]);
+  const [projectsCursor, setProjectsCursor] = useState<string | null>(null);
+  const [searchQuery, setSearchQuery] = useState("");
   const [selectedProject, setSelectedProject] = useState<Project | null>(null);
   const [requests, setRequests] = useState<Request[]>([]);
   const [tasks, setTasks] = useState<Task[]>([]);
@@ -44,38 +47,41 @@ export default function BuyerDashboard() {
     fetchProjects();
   }, []);
 
-  const fetchProjects = async (searchQuery?: string) => {
-    try {
-      const url = searchQuery
-        ? `/projects/search/?q=${encodeURIComponent(searchQuery)}`
-        : "/projects/";
-      const response = await api.get(url);
-      const projectsData = response.data;
-      setProjects(projectsData);
-
-      // Fetch tasks for all projects
-      const tasksMap: Record<string, Task[]> = {};
-      await Promise.all(
-        projectsData.map(async (project: Project) => {
-          if (project.status !== "open") {
-            try {
-              const tasksResponse = await api.get(
-                `/tasks/project/${project.id}`,
-              );
-              tasksMap[project.id] = tasksResponse.data;
-            } catch (error) {
-              console.error(
-                `Failed to fetch tasks for project ${project.id}:`,
-                error,
-              );
-              tasksMap[project.id] = [];
-            }
-          } else {
+  const projectsUrl = (query: string) =>
+    query ? `/projects/search/?q=${encodeURIComponent(query)}` : "/projects/";
+
+  // Tasks of the given projects, keyed by project id
+  const fetchProjectTasks = async (projectsData: Project[]) => {
+    const tasksMap: Record<string, Task[]> = {};
+    await Promise.all(
+      projectsData.map(async (project: Project) => {
+        if (project.status !== "open") {
+          try {
+            tasksMap[project.id] = await fetchAllPages<Task>(
+              `/tasks/project/${project.id}`,
+            );
+          } catch (error) {
+            console.error(
+              `Failed to fetch tasks for project ${project.id}:`,
+              error,
+            );
             tasksMap[project.id] = [];
           }
-        }),
-      );
-      setProjectTasksMap(tasksMap);
+        } else {
+          tasksMap[project.id] = [];
+        }
+      }),
+    );
+    return tasksMap;
+  };
+
+  const fetchProjects = async (query?: string) => {
+    try {
+      const page = await fetchPage<Project>(projectsUrl(query || ""));
+      setSearchQuery(query || "");
+      setProjects(page.items);
+      setProjectsCursor(page.next_cursor);
+      setProjectTasksMap(await fetchProjectTasks(page.items));
     } catch (error) {
       console.error("Failed to fetch projects:", error);
     } finally {
@@ -83,14 +89,28 @@ export default function BuyerDashboard() {
     }
   };
 
+  const loadMoreProjects = async () => {
+    try {
+      const page = await fetchPage<Project>(
+        projectsUrl(searchQuery),
+        projectsCursor,
+      );
+      const tasksMap = await fetchProjectTasks(page.items);
+      setProjects((current) => [...current, ...page.items]);
+      setProjectsCursor(page.next_cursor);
+      setProjectTasksMap((current) => ({ ...current, ...tasksMap }));
+    } catch (error) {
+      console.error("Failed to fetch projects:", error);
+    }
+  };
+
   const handleSearch = (query: string) => {
     fetchProjects(query);
   };
 
   const fetchRequests = async (projectId: string) => {
     try {
-      const response = await api.get(`/requests/project/${projectId}`);
-      setRequests(response.data);
+      setRequests(await fetchAllPages<Request>(`/requests/project/${projectId}`));
     } catch (error: any) {
       console.error("Failed to fetch requests:", error);
       addToast(
@@ -103,8 +123,7 @@ export default function BuyerDashboard() {
 
   const fetchTasks = async (projectId: string) => {
     try {
-      const response = await api.get(`/tasks/project/${projectId}`);
-      setTasks(response.data);
+      setTasks(await fetchAllPages<Task>(`/tasks/project/${projectId}`));
     } catch (error: any) {
       console.error("Failed to fetch tasks:", error);
       addToast(
@@ -230,6 +249,7 @@ export default function BuyerDashboard() {
               <p className="text-gray-600 text-sm">Total Projects</p>
               <p className="text-3xl font-bold text-gray-800">
                 {projects.length}
+                {projectsCursor && "+"}
               </p>
             </div>
             <FolderKanban className="w-12 h-12 text-primary-600" />
@@ -287,6 +307,7 @@ export default function BuyerDashboard() {
             />
           ))}
         </div>
+        {projectsCursor && <LoadMoreButton onLoadMore={loadMoreProjects} />}
       </div>
 
       {/* Modals */}
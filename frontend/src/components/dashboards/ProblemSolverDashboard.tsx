@@ -10,7 +10,7 @@ import {
   Award,
   ExternalLink,
 } from "lucide-react";
-import api from "@/lib/api";
+import api, { fetchAllPages, fetchPage } from "@/lib/api";
 import { Project, Task } from "@/types";
 import ProjectCard from "@/components/cards/ProjectCard";
 import CreateTaskModal from "@/components/modals/CreateTaskModal";
@@ -20,6 +20,7 @@ import ProjectDetailsModal from "@/components/modals/ProjectDetailsModal";
 import ProjectManagementModal from "@/components/modals/ProjectManagementModal";
 import PlanSubmissionModal from "@/components/modals/PlanSubmissionModal";
 import SearchBar from "@/components/common/SearchBar";
+import LoadMoreButton from "@/components/common/LoadMoreButton";
 import { useToastStore } from "@/store/toastStore";
 import { useAuthStore } from "@/store/authStore";
 
@@ -28,6 +29,8 @@ export default function ProblemSolverDashboard() {
   const { user } = useAuthStore();
   const [projects, setProjects] = useState<Project[]>([]);
   const [myProjects, setMyProjects] = useState<Project[]>([]);
+  const [projectsCursor, setProjectsCursor] = useState<string | null>(null);
+  const [searchQuery, setSearchQuery] = useState("");
   const [tasks, setTasks] = useState<Task[]>([]);
   const [selectedProject, setSelectedProject] = useState<Project | null>(null);
   const [showCreateTaskModal, setShowCreateTaskModal] = useState(false);
@@ -42,13 +45,15 @@ export default function ProblemSolverDashboard() {
     fetchProjects();
   }, []);
 
-  const fetchProjects = async (searchQuery?: string) => {
+  const projectsUrl = (query: string) =>
+    query ? `/projects/search/?q=${encodeURIComponent(query)}` : "/projects/";
+
+  const fetchProjects = async (query?: string) => {
     try {
-      const url = searchQuery
-        ? `/projects/search/?q=${encodeURIComponent(searchQuery)}`
-        : "/projects/";
-      const response = await api.get(url);
-      const allProjects = response.data;
+      const page = await fetchPage<Project>(projectsUrl(query || ""));
+      const allProjects = page.items;
+      setSearchQuery(query || "");
+      setProjectsCursor(page.next_cursor);
       setProjects(allProjects.filter((p: Project) => p.status === "open"));
       setMyProjects(allProjects.filter((p: Project) => p.status !== "open"));
 
@@ -68,14 +73,33 @@ export default function ProblemSolverDashboard() {
     }
   };
 
+  const loadMoreProjects = async () => {
+    try {
+      const page = await fetchPage<Project>(
+        projectsUrl(searchQuery),
+        projectsCursor,
+      );
+      setProjects((current) => [
+        ...current,
+        ...page.items.filter((p: Project) => p.status === "open"),
+      ]);
+      setMyProjects((current) => [
+        ...current,
+        ...page.items.filter((p: Project) => p.status !== "open"),
+      ]);
+      setProjectsCursor(page.next_cursor);
+    } catch (error) {
+      console.error("Failed to fetch projects:", error);
+    }
+  };
+
   const handleSearch = (query: string) => {
     fetchProjects(query);
   };
 
   const fetchTasks = async (projectId: string) => {
     try {
-      const response = await api.get(`/tasks/project/${projectId}`);
-      setTasks(response.data);
+      setTasks(await fetchAllPages<Task>(`/tasks/project/${projectId}`));
     } catch (error) {
       console.error("Failed to fetch tasks:", error);
     }
@@ -291,6 +315,7 @@ export default function ProblemSolverDashboard() {
               <p className="text-gray-600 text-sm">Available Projects</p>
               <p className="text-3xl font-bold text-gray-800">
                 {projects.length}
+                {projectsCursor && "+"}
               </p>
             </div>
             <FolderKanban className="w-12 h-12 text-primary-600" />
@@ -386,6 +411,7 @@ export default function ProblemSolverDashboard() {
             />
           ))}
         </div>
+        {projectsCursor && <LoadMoreButton onLoadMore={loadMoreProjects} />}
       </div>
 
       {/* Modals */}
@@ -1,4 +1,5 @@
 import axios from "axios";
+import { Page } from "@/types";
 
 const API_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 
@@ -41,3 +42,34 @@ api.interceptors.response.use(
 );
 
 export default api;
+
+// Dashboards show one page of a listing and fetch the next on "Load more"
+export const PAGE_SIZE = 50;
+
+// List endpoints return one page at a time; pass the previous page's next_cursor
+// to get the one after it
+export async function fetchPage<T>(
+  url: string,
+  cursor?: string | null,
+  limit: number = PAGE_SIZE,
+): Promise<Page<T>> {
+  const params: Record<string, string | number> = { limit };
+  if (cursor) {
+    params.cursor = cursor;
+  }
+  const response = await api.get<Page<T>>(url, { params });
+  return response.data;
+}
+
+// Follows next_cursor to collect every page. Only for lists scoped to one project
+// (its requests and tasks), which stay small; top-level listings use fetchPage.
+export async function fetchAllPages<T>(url: string): Promise<T[]> {
+  const items: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const page: Page<T> = await fetchPage<T>(url, cursor, 200);
+    items.push(...page.items);
+    cursor = page.next_cursor;
+  } while (cursor);
+  return items;
+}
@@ -95,3 +95,8 @@ export interface AuthResponse {
   access_token: string;
   token_type: string;
 }
+
+export interface Page<T> {
+  items: T[];
+  next_cursor: string | null;
+}